@@ -0,0 +1,162 @@
+import re
+
+from unidecode import unidecode
+
+# Códigos postales argentinos: B1609BGI (CPA), B1640, y "B1642 BIU" antes de una coma
+RE_CODIGO_POSTAL = re.compile(r"\b[a-z]\d{4}(?:[a-z]{3}\b|\s[a-z]{3}(?=\s*,)|\b)")
+RE_NUMERO_SIGNO = re.compile(r"[°º]")
+RE_ENTRE = re.compile(r"\be\s*/\s*")
+RE_NO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+# Abreviaturas de una palabra
+ABREVIATURAS = {
+    "av": "avenida",
+    "avda": "avenida",
+    "gral": "general",
+    "pte": "presidente",
+    "pres": "presidente",
+    "cnel": "coronel",
+    "tte": "teniente",
+    "dr": "doctor",
+    "ing": "ingeniero",
+    "sta": "santa",
+    "sto": "santo",
+    "esq": "esquina",
+    "pcia": "provincia",
+    "prov": "provincia",
+    "cno": "camino",
+    "gdor": "gobernador",
+    "virr": "virreyes",
+    "vict": "victoria",
+}
+
+# Abreviaturas de varias palabras (las que SanFernandoScraper reemplazaba a mano)
+ABREVIATURAS_COMPUESTAS = [
+    ("san fdo", "san fernando"),
+    ("s f", "san fernando"),
+    ("bs as", "buenos aires"),
+]
+
+# Partes que se repiten al final de muchas direcciones y no aportan a la búsqueda
+SUFIJOS_REDUNDANTES = [
+    "argentina",
+    "provincia de buenos aires",
+    "buenos aires",
+]
+
+# Marcadores de número de puerta: "N° 123", "Nro 123", "No 123"
+MARCADORES_NUMERO = {"n", "nro", "no", "num"}
+
+
+def normalizar_texto(texto):
+    """
+    Pasa a minúsculas ASCII, quita los signos de puntuación y colapsa los espacios.
+    """
+    texto = unidecode(RE_NUMERO_SIGNO.sub(" ", texto)).lower()
+    texto = RE_ENTRE.sub(" entre ", texto)
+    return " ".join(RE_NO_ALFANUMERICO.sub(" ", texto).split())
+
+
+def slug(texto):
+    """
+    Versión apta para nombres de archivo y URLs: "Mar del Plata" -> "mar-del-plata".
+    """
+    return "-".join(normalizar_texto(texto).split())
+
+
+def clave_canonica(direccion, localidad=None):
+    """
+    Devuelve la clave de cache para una dirección: sin acentos, en minúsculas,
+    sin código postal ni sufijos de provincia/país, con las abreviaturas
+    expandidas y la puntuación y los espacios unificados.
+
+    Si se indica `localidad` y la dirección no la menciona, se agrega al final,
+    así "Rivadavia 1102" de Zárate y "Rivadavia 1102, Zarate" comparten clave.
+    """
+    if not direccion:
+        return ""
+
+    texto = unidecode(RE_NUMERO_SIGNO.sub(" ", direccion)).lower()
+    texto = RE_CODIGO_POSTAL.sub(" ", texto)
+    texto = normalizar_texto(texto)
+
+    palabras = texto.split()
+    resultado = []
+    for i, palabra in enumerate(palabras):
+        siguiente = palabras[i + 1] if i + 1 < len(palabras) else ""
+        if palabra in MARCADORES_NUMERO and siguiente.isdigit():
+            continue
+        resultado.append(ABREVIATURAS.get(palabra, palabra))
+    texto = f" {' '.join(resultado)} "
+
+    for abreviatura, completa in ABREVIATURAS_COMPUESTAS:
+        texto = texto.replace(f" {abreviatura} ", f" {completa} ")
+    texto = texto.strip()
+
+    quitado = True
+    while quitado:
+        quitado = False
+        for sufijo in SUFIJOS_REDUNDANTES:
+            if texto.endswith(f" {sufijo}"):
+                texto = texto[: -len(sufijo) - 1]
+                quitado = True
+
+    if localidad:
+        loc = clave_canonica(localidad)
+        if loc and f" {loc} " not in f" {texto} ":
+            texto = f"{texto} {loc}"
+    return texto
+
+
+def direcciones_del_corpus(paths):
+    """
+    Recorre archivos con el formato de farmacias_turno.json (mes -> localidad ->
+    dias) y devuelve la lista de (direccion, localidad) que contienen.
+    """
+    import json
+
+    pares = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for localidades in data.values():
+            for localidad, contenido in localidades.items():
+                if not isinstance(contenido, dict):
+                    continue
+                for farmacias in contenido.get("dias", {}).values():
+                    for farmacia in farmacias:
+                        if farmacia.get("direccion"):
+                            pares.append((farmacia["direccion"], localidad))
+    return pares
+
+
+def reporte_tasa_de_aciertos(cache, pares):
+    """
+    Compara cuántas direcciones del corpus se encuentran en el cache usando la
+    dirección literal y usando la clave canónica.
+    """
+    claves_cache = {clave_canonica(d) for d in cache}
+    unicas = set(pares)
+    literal = sum(1 for direccion, _ in unicas if direccion in cache)
+    canonica = sum(
+        1 for direccion, localidad in unicas
+        if direccion in cache
+        or clave_canonica(direccion, localidad) in claves_cache
+        or clave_canonica(direccion) in claves_cache
+    )
+    total = len(unicas) or 1
+    print(f"[INFO] Direcciones únicas en el corpus: {len(unicas)}")
+    print(f"[INFO] Entradas en el cache: {len(cache)} -> {len(claves_cache)} claves canónicas "
+          f"({len(cache) - len(claves_cache)} búsquedas con Selenium repetidas)")
+    print(f"[INFO] Aciertos con la dirección literal: {literal} ({literal / total:.1%})")
+    print(f"[INFO] Aciertos con la clave canónica:    {canonica} ({canonica / total:.1%})")
+
+
+if __name__ == "__main__":
+    import glob
+    import json
+
+    with open("coordenadas_cache.json", "r", encoding="utf-8") as f:
+        cache = json.load(f)
+    corpus = sorted(glob.glob("sources/*.json")) + ["data/farmacias_turno.json"] + sorted(glob.glob("data/old/*.json"))
+    reporte_tasa_de_aciertos(cache, direcciones_del_corpus(corpus))
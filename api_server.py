@@ -0,0 +1,282 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import math
+import os
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from address_normalizer import slug
+from farmacias_cercanas import (
+    BuscadorFarmacias, MESES, TURNOS_JSON, FARMACIAS_24H_JSON, LOCALIDADES_JSON, fecha_de_turno, lat_lng,
+)
+from output_writer import codificar, comprimir_gzip
+from publish import respuesta_del_dia
+
+# Por debajo de este tamaño no vale la pena servir la versión gzip
+MIN_GZIP = 1024
+MAX_K = 50
+
+ESTADOS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+class Respuesta:
+    """
+    Respuesta JSON serializada una sola vez: cuerpo, versión gzip y ETag
+    (hash del contenido) quedan listos para escribirse tal cual en el socket.
+    """
+    __slots__ = ("estado", "cuerpo", "cuerpo_gzip", "etag", "_cabeceras", "_cabeceras_gzip")
+
+    def __init__(self, data, estado=200, cache_control="public, max-age=60"):
+        self.estado = estado
+        self.cuerpo = codificar(data)
+        self.etag = f'"{hashlib.sha1(self.cuerpo).hexdigest()[:20]}"'
+        self.cuerpo_gzip = comprimir_gzip(self.cuerpo) if len(self.cuerpo) >= MIN_GZIP else None
+
+        comunes = (
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Cache-Control: {cache_control}\r\n"
+            f"ETag: {self.etag}\r\n"
+            f"Vary: Accept-Encoding\r\n"
+        )
+        self._cabeceras = f"HTTP/1.1 {estado} {ESTADOS[estado]}\r\n{comunes}Content-Length: {len(self.cuerpo)}\r\n".encode("latin-1")
+        self._cabeceras_gzip = None
+        if self.cuerpo_gzip is not None:
+            self._cabeceras_gzip = (
+                f"HTTP/1.1 {estado} {ESTADOS[estado]}\r\n{comunes}"
+                f"Content-Encoding: gzip\r\nContent-Length: {len(self.cuerpo_gzip)}\r\n"
+            ).encode("latin-1")
+
+    def bytes_para(self, cabeceras, mantener, head=False):
+        """
+        Arma los bytes a enviar según If-None-Match y Accept-Encoding del pedido.
+        """
+        conexion = b"" if mantener else b"Connection: close\r\n"
+        if_none_match = cabeceras.get("if-none-match")
+        if if_none_match and self.estado == 200 and (if_none_match == "*" or self.etag in if_none_match):
+            return f"HTTP/1.1 304 Not Modified\r\nETag: {self.etag}\r\n".encode("latin-1") + conexion + b"\r\n"
+        if self.cuerpo_gzip is not None and "gzip" in cabeceras.get("accept-encoding", ""):
+            return self._cabeceras_gzip + conexion + b"\r\n" + (b"" if head else self.cuerpo_gzip)
+        return self._cabeceras + conexion + b"\r\n" + (b"" if head else self.cuerpo)
+
+
+def error(estado, mensaje):
+    return Respuesta({"error": mensaje}, estado=estado, cache_control="no-store")
+
+
+NO_ENCONTRADO = error(404, "No encontrado")
+METODO_NO_PERMITIDO = error(405, "Solo se aceptan GET y HEAD")
+PEDIDO_INVALIDO = error(400, "Pedido inválido")
+ERROR_INTERNO = error(500, "Error interno")
+
+
+class DatosAPI:
+    """
+    Datos de farmacias_turno.json, farmacias_24_horas.json y localidades.json
+    indexados en memoria, con las respuestas de cada (localidad, día) ya
+    serializadas. Las localidades se identifican por su slug ("mar-del-plata").
+    """
+    def __init__(self, turnos, farmacias_24h, localidades):
+        self.buscador = BuscadorFarmacias(turnos, farmacias_24h, localidades)
+        self.turnos = {}  # (slug, mes, dia) -> Respuesta
+
+        for mes, locs in turnos.items():
+            for localidad, contenido in locs.items():
+                clave_localidad = slug(localidad)
+                for dia, farmacias in contenido.get("dias", {}).items():
+                    try:
+                        numero = int(dia)
+                    except ValueError:
+                        continue
+                    self.turnos[(clave_localidad, mes.lower(), numero)] = Respuesta(
+                        respuesta_del_dia(localidad, mes, numero, contenido, farmacias)
+                    )
+
+        self.farmacias_24h = Respuesta(farmacias_24h)
+        self.farmacias_24h_por_localidad = {}
+        for localidad, farmacias in farmacias_24h.items():
+            self.farmacias_24h_por_localidad[slug(localidad)] = Respuesta(
+                {"localidad": localidad, "farmacias": farmacias}
+            )
+
+        con_turnos = {clave for clave, _, _ in self.turnos}
+        lista = []
+        for provincia, locs in localidades.items():
+            for localidad in locs:
+                clave_localidad = slug(localidad["nombre"])
+                punto = lat_lng(localidad.get("coordenadas"))
+                lista.append({
+                    "nombre": localidad["nombre"],
+                    "slug": clave_localidad,
+                    "provincia": provincia,
+                    "coordenadas": {"lat": punto[0], "lng": punto[1]} if punto else None,
+                    "turnos": clave_localidad in con_turnos,
+                })
+        self.localidades = Respuesta(lista)
+
+    @classmethod
+    def desde_archivos(cls, turnos_path=TURNOS_JSON, farmacias_24h_path=FARMACIAS_24H_JSON,
+                       localidades_path=LOCALIDADES_JSON):
+        def cargar(path):
+            if not path or not os.path.exists(path):
+                return {}
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        return cls(cargar(turnos_path), cargar(farmacias_24h_path), cargar(localidades_path))
+
+    def turnos_del_dia(self, localidad, fecha):
+        return self.turnos.get((localidad, MESES[fecha.month - 1], fecha.day))
+
+
+class ServidorAPI:
+    """
+    Servidor HTTP/1.1 mínimo sobre asyncio (keep-alive, GET y HEAD) que
+    responde desde DatosAPI. Endpoints:
+
+    - /localidades
+    - /turnos/{localidad}              turnos vigentes ahora (corte 8:30)
+    - /turnos/{localidad}/{AAAA-MM-DD} turnos de esa fecha
+    - /24h y /24h/{localidad}
+    - /cercanas?lat=..&lng=..&k=5      farmacias abiertas más cercanas
+
+    Cada `recarga_segundos` revisa la fecha de modificación de los archivos y,
+    si cambiaron, vuelve a armar los índices en un thread aparte.
+    """
+    def __init__(self, archivos=(TURNOS_JSON, FARMACIAS_24H_JSON, LOCALIDADES_JSON), recarga_segundos=60):
+        self.archivos = archivos
+        self.recarga_segundos = recarga_segundos
+        self._mtimes = self._leer_mtimes()
+        self.datos = DatosAPI.desde_archivos(*archivos)
+
+    def _leer_mtimes(self):
+        return [os.path.getmtime(path) if os.path.exists(path) else None for path in self.archivos]
+
+    async def _recargar_periodicamente(self):
+        while True:
+            await asyncio.sleep(self.recarga_segundos)
+            mtimes = self._leer_mtimes()
+            if mtimes != self._mtimes:
+                try:
+                    self.datos = await asyncio.to_thread(DatosAPI.desde_archivos, *self.archivos)
+                    self._mtimes = mtimes
+                    print("[INFO] Datos de la API recargados.")
+                except Exception as e:
+                    print(f"[ADVERTENCIA] No se pudieron recargar los datos de la API: {e}")
+
+    def resolver(self, destino):
+        """
+        Devuelve la Respuesta para una ruta (con query string).
+        """
+        partes = urlsplit(destino)
+        segmentos = [unquote(s) for s in partes.path.strip("/").split("/") if s]
+        datos = self.datos
+
+        if segmentos == ["localidades"]:
+            return datos.localidades
+        if segmentos and segmentos[0] == "turnos" and len(segmentos) in (2, 3):
+            if len(segmentos) == 2:
+                fecha = fecha_de_turno()
+            else:
+                try:
+                    fecha = datetime.date.fromisoformat(segmentos[2])
+                except ValueError:
+                    return PEDIDO_INVALIDO
+            return datos.turnos_del_dia(slug(segmentos[1]), fecha) or NO_ENCONTRADO
+        if segmentos == ["24h"]:
+            return datos.farmacias_24h
+        if len(segmentos) == 2 and segmentos[0] == "24h":
+            return datos.farmacias_24h_por_localidad.get(slug(segmentos[1]), NO_ENCONTRADO)
+        if segmentos == ["cercanas"]:
+            parametros = parse_qs(partes.query)
+            try:
+                lat = float(parametros["lat"][0])
+                lng = float(parametros["lng"][0])
+                k = min(int(parametros.get("k", ["5"])[0]), MAX_K)
+            except (KeyError, ValueError):
+                return PEDIDO_INVALIDO
+            # float() acepta "nan" e "inf", que no son una posición
+            if not (math.isfinite(lat) and math.isfinite(lng) and -90 <= lat <= 90 and -180 <= lng <= 180) or k < 1:
+                return PEDIDO_INVALIDO
+            return Respuesta({
+                "localidad": datos.buscador.localidad_mas_cercana(lat, lng),
+                "farmacias": datos.buscador.cercanas(lat, lng, k),
+            }, cache_control="no-cache")
+        return NO_ENCONTRADO
+
+    async def atender(self, reader, writer):
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, destino, version = linea.decode("latin-1").split()
+                except ValueError:
+                    writer.write(PEDIDO_INVALIDO.bytes_para({}, False))
+                    break
+
+                cabeceras = {}
+                while True:
+                    cabecera = await reader.readline()
+                    if cabecera in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = cabecera.decode("latin-1").partition(":")
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+                # Los cuerpos de los pedidos no se usan, pero hay que consumirlos
+                largo = cabeceras.get("content-length", "0")
+                if largo.isdigit() and int(largo):
+                    await reader.readexactly(int(largo))
+
+                conexion = cabeceras.get("connection", "").lower()
+                mantener = conexion != "close" if version == "HTTP/1.1" else conexion == "keep-alive"
+
+                if metodo not in ("GET", "HEAD"):
+                    respuesta = METODO_NO_PERMITIDO
+                else:
+                    try:
+                        respuesta = self.resolver(destino)
+                    except Exception as e:
+                        # Un pedido que rompe algo no tiene que cortar la conexión sin respuesta
+                        print(f"[ERROR] Falló el pedido {destino}: {e!r}")
+                        respuesta = ERROR_INTERNO
+                writer.write(respuesta.bytes_para(cabeceras, mantener, head=metodo == "HEAD"))
+                await writer.drain()
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def servir(self, host="127.0.0.1", port=8080):
+        servidor = await asyncio.start_server(self.atender, host, port, backlog=1024)
+        recarga = asyncio.create_task(self._recargar_periodicamente())
+        print(f"[INFO] API escuchando en http://{host}:{port} "
+              f"({len(self.datos.turnos)} respuestas de turnos precalculadas)")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            recarga.cancel()
+
+
+def main(argumentos):
+    """
+    python api_server.py [PUERTO]. La configuración (API_HOST, API_PORT y
+    API_RECARGA_SEGUNDOS) se lee al arrancar.
+    """
+    host = os.getenv("API_HOST", "127.0.0.1")
+    puerto = int(argumentos[0]) if argumentos else int(os.getenv("API_PORT", "8080"))
+    servidor = ServidorAPI(recarga_segundos=float(os.getenv("API_RECARGA_SEGUNDOS", "60")))
+    try:
+        asyncio.run(servidor.servir(host, puerto))
+    except KeyboardInterrupt:
+        print("\n[INFO] API detenida.")
+
+
+if __name__ == "__main__":
+    import sys
+
+    main(sys.argv[1:])
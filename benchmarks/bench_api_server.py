@@ -0,0 +1,113 @@
+"""
+Prueba de carga local de api_server: levanta el servidor en otro proceso y le
+pega con conexiones keep-alive concurrentes, midiendo pedidos por segundo y
+latencia para cada tipo de endpoint.
+
+Uso:
+    python -m benchmarks.bench_api_server [CONEXIONES] [PEDIDOS_POR_CONEXION]
+"""
+import asyncio
+import multiprocessing
+import random
+import socket
+import sys
+import time
+
+from api_server import DatosAPI, ServidorAPI
+from farmacias_cercanas import MESES
+
+HOST = "127.0.0.1"
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def correr_servidor(puerto):
+    asyncio.run(ServidorAPI().servir(HOST, puerto))
+
+
+async def esperar_servidor(puerto, timeout=30):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            _, writer = await asyncio.open_connection(HOST, puerto)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("El servidor no arrancó a tiempo")
+
+
+async def leer_respuesta(reader):
+    cabeceras = await reader.readuntil(b"\r\n\r\n")
+    estado = int(cabeceras[9:12])
+    largo = 0
+    for linea in cabeceras.split(b"\r\n"):
+        if linea.lower().startswith(b"content-length:"):
+            largo = int(linea.split(b":", 1)[1])
+    if largo:
+        await reader.readexactly(largo)
+    return estado
+
+
+async def cliente(puerto, rutas, pedidos, extra, latencias, estados):
+    reader, writer = await asyncio.open_connection(HOST, puerto)
+    try:
+        for i in range(pedidos):
+            ruta = rutas[i % len(rutas)]
+            inicio = time.perf_counter()
+            writer.write(f"GET {ruta} HTTP/1.1\r\nHost: {HOST}\r\n{extra(ruta)}\r\n".encode("latin-1"))
+            estado = await leer_respuesta(reader)
+            latencias.append(time.perf_counter() - inicio)
+            estados[estado] = estados.get(estado, 0) + 1
+    finally:
+        writer.close()
+
+
+async def escenario(nombre, puerto, rutas, conexiones, pedidos, extra=lambda ruta: ""):
+    latencias, estados = [], {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        cliente(puerto, rutas, pedidos, extra, latencias, estados) for _ in range(conexiones)
+    ))
+    total = time.perf_counter() - inicio
+    latencias.sort()
+    p50 = latencias[len(latencias) // 2] * 1000
+    p99 = latencias[int(len(latencias) * 0.99)] * 1000
+    print(f"{nombre:<28}{len(latencias) / total:>12,.0f}{p50:>10.2f}{p99:>10.2f}   {estados}")
+
+
+async def main(conexiones=50, pedidos=400):
+    datos = DatosAPI.desde_archivos()
+    claves = list(datos.turnos)
+    rng = random.Random(42)
+    rng.shuffle(claves)
+    rutas_turnos = [f"/turnos/{localidad}/2025-{MESES.index(mes) + 1:02d}-{dia:02d}" for localidad, mes, dia in claves[:500]]
+    etags = {ruta: datos.turnos[clave].etag for ruta, clave in zip(rutas_turnos, claves)}
+    rutas_cercanas = [f"/cercanas?lat={rng.uniform(-38.5, -34.3):.4f}&lng={rng.uniform(-61, -57.5):.4f}" for _ in range(200)]
+
+    puerto = puerto_libre()
+    proceso = multiprocessing.Process(target=correr_servidor, args=(puerto,), daemon=True)
+    proceso.start()
+    try:
+        await esperar_servidor(puerto)
+        print(f"[INFO] {conexiones} conexiones keep-alive x {pedidos} pedidos, servidor en un solo proceso")
+        print(f"{'escenario':<28}{'pedidos/s':>12}{'p50 (ms)':>10}{'p99 (ms)':>10}   estados")
+        await escenario("turnos por (localidad, día)", puerto, rutas_turnos, conexiones, pedidos)
+        await escenario("turnos con If-None-Match", puerto, rutas_turnos, conexiones, pedidos,
+                        lambda ruta: f"If-None-Match: {etags[ruta]}\r\n")
+        await escenario("24h (gzip)", puerto, ["/24h"], conexiones, pedidos, lambda ruta: "Accept-Encoding: gzip\r\n")
+        await escenario("localidades (gzip)", puerto, ["/localidades"], conexiones, pedidos,
+                        lambda ruta: "Accept-Encoding: gzip\r\n")
+        await escenario("cercanas", puerto, rutas_cercanas, conexiones, pedidos // 4)
+    finally:
+        proceso.terminate()
+        proceso.join()
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*argumentos))
@@ -0,0 +1,117 @@
+"""
+Compara el commit de una corrida en un repo de prueba con un remoto local:
+
+- antes: index.add_all() de todo el árbol (logs/ incluido) y push sincrónico.
+- después: solo los archivos de la corrida y las rutas de salida, y push en
+  segundo plano (commit_and_push vuelve sin esperar al push).
+
+Cada corrida modifica CAMBIOS shards y agrega un log nuevo.
+
+Uso:
+    python -m benchmarks.bench_commit [SHARDS] [LOGS] [CORRIDAS]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from pygit2 import Signature, init_repository
+
+import metrics
+import utils
+
+CAMBIOS = 20
+BYTES_LOG = 200_000
+
+
+def crear_repo(directorio, shards, logs, ignorar_logs):
+    remoto = os.path.join(directorio, "remoto.git")
+    init_repository(remoto, bare=True)
+    trabajo = os.path.join(directorio, "trabajo")
+    repo = init_repository(trabajo, initial_head="main")
+    repo.remotes.create("origin", remoto)
+    # push() toma las credenciales de GITHUB_REMOTE; un remoto local no las necesita
+    os.environ["GITHUB_REMOTE"] = remoto
+
+    with open(os.path.join(trabajo, ".gitignore"), "w") as f:
+        f.write("/logs/\n" if ignorar_logs else "")
+    for i in range(shards):
+        path = os.path.join(trabajo, "data", "turnos", f"mes{i % 12}", f"localidad{i}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f'{{"localidad": {i}, "dias": {{}}}}\n' * 20)
+    os.makedirs(os.path.join(trabajo, "logs"))
+    for i in range(logs):
+        with open(os.path.join(trabajo, "logs", f"scraper_{i}.log"), "w") as f:
+            f.write("x" * BYTES_LOG)
+
+    repo.index.add_all()
+    repo.index.write()
+    firma = Signature("bench", "bench@example.com")
+    repo.create_commit("refs/heads/main", firma, firma, "inicial", repo.index.write_tree(), [])
+    repo.remotes["origin"].push(["refs/heads/main"])
+    return trabajo
+
+
+def simular_corrida(trabajo, corrida, shards):
+    escritos = []
+    for i in range(CAMBIOS):
+        path = os.path.join("data", "turnos", f"mes{i % 12}", f"localidad{(corrida * CAMBIOS + i) % shards}.json")
+        with open(path, "a") as f:
+            f.write(f'{{"corrida": {corrida}}}\n')
+        escritos.append(path)
+    with open(os.path.join("logs", f"corrida_{corrida}.log"), "w") as f:
+        f.write("x" * BYTES_LOG)
+    return escritos
+
+
+def segundos_de(nombre):
+    return metrics.get_metricas().etapas.get(nombre, {}).get("segundos", 0.0)
+
+
+def escenario(shards, logs, corridas, dirigido):
+    directorio = tempfile.mkdtemp(prefix="bench_commit_")
+    anterior = os.getcwd()
+    try:
+        trabajo = crear_repo(directorio, shards, logs, ignorar_logs=dirigido)
+        os.chdir(trabajo)
+        staging = push = bloqueo = 0.0
+        for corrida in range(corridas):
+            escritos = simular_corrida(trabajo, corrida, shards)
+            staging_previo, push_previo = segundos_de("staging"), segundos_de("push")
+            inicio = time.perf_counter()
+            if dirigido:
+                utils.commit_and_push(trabajo, "corrida", archivos=escritos)
+                bloqueo += time.perf_counter() - inicio
+                utils.esperar_push()
+            else:
+                utils.commit_and_push(trabajo, "corrida", en_segundo_plano=False)
+                bloqueo += time.perf_counter() - inicio
+            staging += segundos_de("staging") - staging_previo
+            push += segundos_de("push") - push_previo
+        return staging / corridas, push / corridas, bloqueo / corridas
+    finally:
+        os.chdir(anterior)
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def main(shards=3000, logs=300, corridas=5):
+    salida = sys.stdout
+    print(f"[INFO] {shards} shards, {logs} logs de {BYTES_LOG // 1000} KB, {CAMBIOS} shards cambiados por corrida, "
+          f"promedio de {corridas} corridas")
+    print(f"{'escenario':<12}{'staging (ms)':>14}{'push (ms)':>12}{'commit_and_push (ms)':>22}")
+    for nombre, dirigido in (("antes", False), ("después", True)):
+        # Los mensajes de commit_and_push taparían la tabla
+        sys.stdout = open(os.devnull, "w")
+        try:
+            staging, push, bloqueo = escenario(shards, logs, corridas, dirigido)
+        finally:
+            sys.stdout.close()
+            sys.stdout = salida
+        print(f"{nombre:<12}{staging * 1000:>14.1f}{push * 1000:>12.1f}{bloqueo * 1000:>22.1f}")
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:4]]
+    main(*argumentos)
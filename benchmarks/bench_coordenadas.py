@@ -0,0 +1,95 @@
+"""
+Mide la extracción de coordenadas sobre todos los links de mapa de los archivos
+de datos, comparando la implementación anterior (regex sin compilar, una por
+patrón) con coordenadas.extraer_coordenadas_lote.
+
+Uso:
+    python -m benchmarks.bench_coordenadas
+"""
+import glob
+import json
+import re
+import time
+
+from coordenadas import extraer_coordenadas, extraer_coordenadas_lote
+
+ARCHIVOS = ["data/farmacias_turno.json", "data/farmacias_24_horas.json"] + sorted(glob.glob("data/old/*.json"))
+REPETICIONES = 20
+
+
+def extraer_referencia(url):
+    """
+    Implementación anterior de get_coords_from_maps.extraer_coordenadas_desde_url.
+    """
+    try:
+        match_real_coords = re.search(r"!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)", url)
+        if match_real_coords:
+            return {"lat": float(match_real_coords.group(1)), "lng": float(match_real_coords.group(2))}
+        match_embed = re.search(r"!2d(-?\d+\.\d+)!3d(-?\d+\.\d+)", url)
+        if match_embed:
+            return {"lat": float(match_embed.group(2)), "lng": float(match_embed.group(1))}
+        match_dest = re.search(r"[?&]destination=(-?\d+\.\d+),(-?\d+\.\d+)", url)
+        if match_dest:
+            return {"lat": float(match_dest.group(1)), "lng": float(match_dest.group(2))}
+        if "/@" in url:
+            partes = url[url.find("/@") + 2:].split(",")
+            if len(partes) >= 2:
+                return {"lat": float(partes[0]), "lng": float(partes[1])}
+        match_fallback = re.search(r"(-3\d+\.\d+),(-5\d+\.\d+)", url)
+        if match_fallback:
+            return {"lat": float(match_fallback.group(1)), "lng": float(match_fallback.group(2))}
+        match_fallback = re.search(r"(-3\d+\.\d+),(-6\d+\.\d+)", url)
+        if match_fallback:
+            return {"lat": float(match_fallback.group(1)), "lng": float(match_fallback.group(2))}
+        return None
+    except Exception:
+        return None
+
+
+def urls_de_los_datos():
+    urls = []
+
+    def recorrer(nodo):
+        if isinstance(nodo, dict):
+            if isinstance(nodo.get("mapa"), str):
+                urls.append(nodo["mapa"])
+            for valor in nodo.values():
+                recorrer(valor)
+        elif isinstance(nodo, list):
+            for valor in nodo:
+                recorrer(valor)
+
+    for path in ARCHIVOS:
+        with open(path, "r", encoding="utf-8") as f:
+            recorrer(json.load(f))
+    return urls
+
+
+def medir(funcion, urls):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        funcion(urls)
+    return (time.perf_counter() - inicio) / REPETICIONES
+
+
+def main():
+    urls = urls_de_los_datos()
+    print(f"[INFO] {len(urls)} links de mapa ({len(set(urls))} distintos) en {len(ARCHIVOS)} archivos")
+
+    referencia = [extraer_referencia(url) for url in urls]
+    nueva = [extraer_coordenadas(url) for url in urls]
+    print(f"[INFO] Con coordenadas: referencia {sum(c is not None for c in referencia)}, "
+          f"nueva {sum(c is not None for c in nueva)}")
+    distintas = sum(1 for a, b in zip(referencia, nueva) if a is not None and a != b)
+    print(f"[INFO] Resultados distintos donde la referencia encontraba coordenadas: {distintas}")
+
+    t_ref = medir(lambda us: [extraer_referencia(u) for u in us], urls)
+    t_una = medir(lambda us: [extraer_coordenadas(u) for u in us], urls)
+    t_lote = medir(extraer_coordenadas_lote, urls)
+    print(f"{'implementación':<28}{'total (ms)':>12}{'por URL (us)':>14}")
+    for nombre, t in [("referencia", t_ref), ("extraer_coordenadas", t_una), ("extraer_coordenadas_lote", t_lote)]:
+        print(f"{nombre:<28}{t * 1000:>12.2f}{t / len(urls) * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Mide el costo de parseo por página del scraper de farmaciadeturnoahora.com.ar.
+
+Uso:
+    python -m benchmarks.bench_farmaciadeturnoahora [pagina.html ...]
+    python -m benchmarks.bench_farmaciadeturnoahora --grabar DIR
+
+Sin argumentos usa una página sintética con 20 farmacias de turno. Con --grabar
+descarga la página de cada fila de LOCALIDADES en DIR para medir sobre páginas reales.
+"""
+import os
+import re
+import sys
+import time
+from urllib.parse import unquote
+
+from bs4 import BeautifulSoup
+
+from scrapers.farmaciadeturnoahora import FarmaciaDeTurnoAhoraScraper, LOCALIDADES, crear_scrapers
+
+REPETICIONES = 50
+
+BLOQUE = """
+<div class="farmacia-de-turno">
+  <h3 class="titulo-farmacia-de-turno">Farmacia {i}</h3>
+  <span class="direccion-farmacia-de-turno">Calle {i} N° 1234</span>
+  <a href="tel:0223-4{i:05d}">0223-4{i:05d}</a>
+  <a href="https://maps.apple.com/?q=-36.{i:05d},-56.{i:05d}">Cómo llegar</a>
+</div>
+"""
+
+
+def pagina_sintetica(cantidad=20):
+    relleno = "<div class='nav'>" + "<a href='#'>link</a>" * 400 + "</div>"
+    bloques = "".join(BLOQUE.format(i=i) for i in range(cantidad))
+    return f"<html><body>{relleno}{bloques}{relleno}</body></html>"
+
+
+def parse_referencia(html, localidad="Azul"):
+    """
+    Parser equivalente a las copias por ciudad que existían antes: selectores
+    CSS y regex sin compilar, y unquote importado dentro del loop.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    farmacias = []
+    for bloque in soup.select("div.farmacia-de-turno"):
+        nombre = bloque.select_one("h3.titulo-farmacia-de-turno").text.strip()
+        direccion_tag = bloque.select_one("span.direccion-farmacia-de-turno")
+        direccion = direccion_tag.text.strip() if direccion_tag else "Dirección no disponible"
+        telefono_tag = bloque.select_one("a[href^='tel:']")
+        telefono = re.sub(r"[^\d+]", "", telefono_tag.text) if telefono_tag else "No disponible"
+        mapa_link_tag = bloque.select_one("a[href*='maps.apple.com']")
+        coords_match = None
+        if mapa_link_tag:
+            href_decoded = unquote(mapa_link_tag.get("href", ""))
+            coords_match = re.search(r"[?&]q=(-?\d+\.\d+),(-?\d+\.\d+)", href_decoded)
+            if not coords_match:
+                coords_match = re.search(r"[?&]coordinate=(-?\d+\.\d+),(-?\d+\.\d+)", href_decoded)
+        farmacias.append((nombre, direccion, telefono, coords_match.groups() if coords_match else None))
+    return farmacias
+
+
+def medir(funcion, html):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        funcion(html)
+    return (time.perf_counter() - inicio) / REPETICIONES * 1000
+
+
+def grabar(directorio):
+    os.makedirs(directorio, exist_ok=True)
+    for scraper in crear_scrapers():
+        response = scraper.get(scraper.URL)
+        path = os.path.join(directorio, scraper.URL.rstrip("/").rsplit("/", 1)[-1] + ".html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"[INFO] Guardada: {path}")
+
+
+def main(args):
+    if args[:1] == ["--grabar"]:
+        grabar(args[1] if len(args) > 1 else "benchmarks/paginas")
+        return
+
+    paginas = {}
+    for path in args:
+        with open(path, "r", encoding="utf-8") as f:
+            paginas[os.path.basename(path)] = f.read()
+    if not paginas:
+        paginas["sintetica (20 farmacias)"] = pagina_sintetica()
+
+    scraper = FarmaciaDeTurnoAhoraScraper(*LOCALIDADES[0])
+    print(f"{'página':<30} {'referencia (ms)':>16} {'actual (ms)':>12}")
+    for nombre, html in paginas.items():
+        referencia = medir(parse_referencia, html)
+        actual = medir(scraper.parse, html)
+        print(f"{nombre:<30} {referencia:>16.2f} {actual:>12.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,73 @@
+"""
+Mide las consultas de farmacias_cercanas.IndiceGrilla sobre farmacias
+sintéticas en la provincia de Buenos Aires (la mitad concentrada en el AMBA,
+como los datos reales) y las compara con un recorrido lineal.
+
+Uso:
+    python -m benchmarks.bench_farmacias_cercanas [CANTIDAD] [CONSULTAS]
+"""
+import random
+import sys
+import time
+
+from farmacias_cercanas import IndiceGrilla, haversine_km
+
+# Rectángulo aproximado de la provincia y del AMBA
+PROVINCIA = (-41.0, -33.3, -63.3, -56.7)
+AMBA = (-35.0, -34.4, -58.9, -58.2)
+CELDAS = (0.01, 0.02, 0.05)
+K = 5
+
+
+def punto(rng, rectangulo):
+    lat_min, lat_max, lng_min, lng_max = rectangulo
+    return rng.uniform(lat_min, lat_max), rng.uniform(lng_min, lng_max)
+
+
+def generar(cantidad, rng):
+    return [punto(rng, AMBA if i % 2 else PROVINCIA) for i in range(cantidad)]
+
+
+def lineal(puntos, lat, lng, k):
+    return sorted((haversine_km(lat, lng, p_lat, p_lng), i) for i, (p_lat, p_lng) in enumerate(puntos))[:k]
+
+
+def main(cantidad=100_000, consultas=1_000):
+    rng = random.Random(42)
+    puntos = generar(cantidad, rng)
+    pedidos = [punto(rng, AMBA if i % 2 else PROVINCIA) for i in range(consultas)]
+    print(f"[INFO] {cantidad:,} farmacias, {consultas:,} consultas de k={K}")
+
+    # Referencia lineal sobre una muestra (es lenta)
+    muestra = pedidos[:20]
+    inicio = time.perf_counter()
+    esperados = [lineal(puntos, lat, lng, K) for lat, lng in muestra]
+    t_lineal = (time.perf_counter() - inicio) / len(muestra) * 1000
+    print(f"{'índice':<16}{'armado (ms)':>12}{'consulta (ms)':>15}{'p99 (ms)':>10}")
+    print(f"{'lineal':<16}{'-':>12}{t_lineal:>15.3f}{'-':>10}")
+
+    for celda in CELDAS:
+        inicio = time.perf_counter()
+        indice = IndiceGrilla(celda)
+        for i, (lat, lng) in enumerate(puntos):
+            indice.agregar(lat, lng, i)
+        t_armado = (time.perf_counter() - inicio) * 1000
+
+        for (lat, lng), esperado in zip(muestra, esperados):
+            obtenido = [item for _, item in indice.cercanos(lat, lng, K)]
+            assert obtenido == [i for _, i in esperado], (celda, lat, lng)
+
+        tiempos = []
+        for lat, lng in pedidos:
+            inicio = time.perf_counter()
+            indice.cercanos(lat, lng, K)
+            tiempos.append(time.perf_counter() - inicio)
+        tiempos.sort()
+        promedio = sum(tiempos) / len(tiempos) * 1000
+        p99 = tiempos[int(len(tiempos) * 0.99)] * 1000
+        print(f"{f'grilla {celda}°':<16}{t_armado:>12.1f}{promedio:>15.3f}{p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:3]]
+    main(*argumentos)
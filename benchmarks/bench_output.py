@@ -0,0 +1,54 @@
+"""
+Compara, para los archivos de salida, el tiempo de codificación de cada
+encoder y los bytes que viajan por la red en cada formato.
+
+Uso:
+    python -m benchmarks.bench_output [archivo.json ...]
+"""
+import json
+import sys
+import time
+
+import output_writer
+from output_writer import ENCODERS, codificar, comprimir_brotli, comprimir_gzip
+
+ARCHIVOS = ["data/farmacias_turno.json", "data/localidades.json", "coordenadas_cache.json"]
+REPETICIONES = 10
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / REPETICIONES * 1000, resultado
+
+
+def main(archivos):
+    for path in archivos:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        print(f"\n{path}")
+
+        print(f"  {'encoder':<10}{'indent=2 (ms)':>15}{'minificado (ms)':>17}")
+        for encoder in ENCODERS:
+            if encoder != "json" and getattr(output_writer, encoder) is None:
+                print(f"  {encoder:<10}{'no instalado':>15}")
+                continue
+            t_pretty, _ = medir(lambda: codificar(data, minificado=False, encoder=encoder))
+            t_min, _ = medir(lambda: codificar(data, encoder=encoder))
+            print(f"  {encoder:<10}{t_pretty:>15.2f}{t_min:>17.2f}")
+
+        pretty = codificar(data, minificado=False)
+        minificado = codificar(data)
+        t_gz, gz = medir(lambda: comprimir_gzip(minificado))
+        t_br, br = medir(lambda: comprimir_brotli(minificado))
+        print(f"  {'formato':<22}{'bytes':>12}{'compresión (ms)':>17}")
+        print(f"  {'indent=2':<22}{len(pretty):>12,}{'':>17}")
+        print(f"  {'minificado':<22}{len(minificado):>12,}{'':>17}")
+        print(f"  {'minificado + gzip -9':<22}{len(gz):>12,}{t_gz:>17.2f}")
+        if br is not None:
+            print(f"  {'minificado + brotli 11':<22}{len(br):>12,}{t_br:>17.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ARCHIVOS)
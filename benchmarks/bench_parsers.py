@@ -0,0 +1,94 @@
+"""
+Compara, por scraper, el tiempo de parseo de cada backend HTML sobre páginas grabadas,
+armando la página completa y solo el FRAGMENTO que declara el scraper.
+
+Uso:
+    python -m benchmarks.bench_parsers --grabar [DIR]   # descarga las páginas
+    python -m benchmarks.bench_parsers [DIR]            # mide (DIR por defecto: benchmarks/paginas)
+"""
+import importlib
+import os
+import re
+import sys
+import time
+
+from scrapers.parsing import BACKENDS, parsear_html
+
+DIR_POR_DEFECTO = "benchmarks/paginas"
+REPETICIONES = 20
+
+# (módulo, clase) de los scrapers que parsean HTML
+SCRAPERS_HTML = [
+    ("scrapers.san_isidro", "SanIsidroScraper"),
+    ("scrapers.tigre", "TigreScraper"),
+    ("scrapers.la_plata", "LaPlataScraper"),
+    ("scrapers.merlo", "MerloScraper"),
+    ("scrapers.florencio_varela", "VarelaScraper"),
+    ("scrapers.san_fernando", "SanFernandoScraper"),
+    ("scrapers.mar_del_plata", "MarDelPlataScraper"),
+]
+
+
+def cargar_scrapers():
+    scrapers = []
+    for modulo, clase in SCRAPERS_HTML:
+        try:
+            scrapers.append(getattr(importlib.import_module(modulo), clase)())
+        except ImportError as e:
+            print(f"[ADVERTENCIA] Se omite {clase}: {e}")
+    from scrapers import farmaciadeturnoahora
+    scrapers.extend(farmaciadeturnoahora.crear_scrapers(bulk=False))
+    return scrapers
+
+
+def nombre_pagina(scraper):
+    nombre = getattr(scraper, "LOCALIDAD", scraper.__class__.__name__)
+    return re.sub(r"[^a-z0-9]+", "_", nombre.lower()).strip("_") + ".html"
+
+
+def grabar(directorio):
+    os.makedirs(directorio, exist_ok=True)
+    for scraper in cargar_scrapers():
+        try:
+            response = scraper.get(scraper.URL)
+        except Exception as e:
+            print(f"[ERROR] No se pudo descargar {scraper.URL}: {e}")
+            continue
+        path = os.path.join(directorio, nombre_pagina(scraper))
+        with open(path, "wb") as f:
+            f.write(response.content)
+        print(f"[INFO] Guardada: {path} ({len(response.content)} bytes)")
+
+
+def medir(markup, fragmento, backend):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        parsear_html(markup, fragmento, backend)
+    return (time.perf_counter() - inicio) / REPETICIONES * 1000
+
+
+def main(args):
+    if args[:1] == ["--grabar"]:
+        grabar(args[1] if len(args) > 1 else DIR_POR_DEFECTO)
+        return
+
+    directorio = args[0] if args else DIR_POR_DEFECTO
+    columnas = [f"{backend}{sufijo}" for backend in BACKENDS for sufijo in ("", "+frag")]
+    print(f"{'scraper':<28}" + "".join(f"{c:>18}" for c in columnas) + "   (ms por página)")
+
+    for scraper in cargar_scrapers():
+        path = os.path.join(directorio, nombre_pagina(scraper))
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            markup = f.read()
+
+        tiempos = []
+        for backend in BACKENDS:
+            tiempos.append(medir(markup, None, backend))
+            tiempos.append(medir(markup, scraper.FRAGMENTO, backend))
+        print(f"{nombre_pagina(scraper)[:-5]:<28}" + "".join(f"{t:>18.2f}" for t in tiempos))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+
+class DriverPool:
+    """
+    Pool de WebDrivers de larga vida que se reutilizan entre búsquedas.
+
+    - `tamaño`: cantidad máxima de navegadores abiertos a la vez (workers en paralelo).
+    - `max_paginas`: cada driver se cierra y se reemplaza después de cargar
+      esa cantidad de páginas, para que la memoria de Chrome no crezca sin límite.
+
+    Los drivers se crean a demanda con `factory()`.
+    """
+    def __init__(self, factory, tamaño=1, max_paginas=50):
+        self._factory = factory
+        self._max_paginas = max_paginas
+        self._disponibles = queue.LifoQueue()
+        self._cupos = threading.BoundedSemaphore(tamaño)
+        self._paginas = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def driver(self):
+        """
+        Presta un driver del pool. Si se produce un error mientras se usa, el
+        driver se descarta en lugar de devolverlo al pool.
+        """
+        self._cupos.acquire()
+        try:
+            try:
+                driver = self._disponibles.get_nowait()
+            except queue.Empty:
+                driver = self._factory()
+                with self._lock:
+                    self._paginas[driver] = 0
+
+            sano = False
+            try:
+                yield driver
+                sano = True
+            finally:
+                with self._lock:
+                    self._paginas[driver] += 1
+                    agotado = self._paginas[driver] >= self._max_paginas
+                if sano and not agotado:
+                    self._disponibles.put(driver)
+                else:
+                    self._cerrar(driver)
+        finally:
+            self._cupos.release()
+
+    def _cerrar(self, driver):
+        with self._lock:
+            self._paginas.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"[ADVERTENCIA] No se pudo cerrar el navegador: {e}")
+
+    def cerrar(self):
+        """
+        Cierra todos los drivers que están libres en el pool.
+        """
+        while True:
+            try:
+                driver = self._disponibles.get_nowait()
+            except queue.Empty:
+                break
+            self._cerrar(driver)
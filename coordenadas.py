@@ -0,0 +1,81 @@
+import re
+from urllib.parse import unquote
+
+# Patrones de coordenadas en links de mapas, compilados una sola vez y en orden
+# de prioridad: el primero que coincide gana. Cada entrada es (marcador, regex, orden):
+# el regex solo se corre si el texto `marcador` aparece en la URL, y orden indica si
+# el primer grupo es la latitud ("latlng") o la longitud ("lnglat"). Se exige parte
+# decimal: "query=25,1500" o "destination=0,0" no son coordenadas.
+_NUM = r"(-?\d+\.\d+)"
+PATRONES = [
+    # Google: !3dLAT!4dLNG → coordenadas reales del lugar
+    ("!4d", re.compile(rf"!3d{_NUM}!4d{_NUM}"), "latlng"),
+    # Google embed (iframes): !2dLNG!3dLAT
+    ("!2d", re.compile(rf"!2d{_NUM}!3d{_NUM}"), "lnglat"),
+    # Google direcciones: destination=LAT,LNG
+    ("destination=", re.compile(rf"[?&]destination={_NUM},{_NUM}"), "latlng"),
+    # Google búsqueda: query=LAT,LNG (api=1)
+    ("query=", re.compile(rf"[?&]query={_NUM},{_NUM}(?:&|$)"), "latlng"),
+    # Apple Maps: ?q=LAT,LNG, ?coordinate=LAT,LNG o ?ll=LAT,LNG
+    ("=", re.compile(rf"[?&](?:q|coordinate|ll)={_NUM},{_NUM}(?:&|$)"), "latlng"),
+    # Google, centro visual del mapa: /@LAT,LNG,...
+    ("/@", re.compile(rf"/@{_NUM},{_NUM}"), "latlng"),
+    # Fallback: cualquier lat/lng suelto de la provincia, por ejemplo -34.x,-58.x o -34.x,-60.x
+    ("-3", re.compile(r"(-3\d+\.\d+),(-[56]\d+\.\d+)"), "latlng"),
+]
+
+
+def coordenadas_validas(lat, lng):
+    """
+    Descarta lo que no puede ser un punto real: fuera de rango o (0, 0).
+    """
+    return -90 <= lat <= 90 and -180 <= lng <= 180 and (lat, lng) != (0, 0)
+
+
+def extraer_coordenadas(url):
+    """
+    Devuelve {"lat", "lng"} a partir de un link de Google Maps, Apple Maps o de
+    un iframe embed, o None si el link no trae coordenadas.
+    """
+    if not url:
+        return None
+    if "%" in url:
+        url = unquote(url)
+
+    for marcador, patron, orden in PATRONES:
+        if marcador not in url:
+            continue
+        match = patron.search(url)
+        if match:
+            a, b = float(match.group(1)), float(match.group(2))
+            if orden == "lnglat":
+                a, b = b, a
+            if coordenadas_validas(a, b):
+                return {"lat": a, "lng": b}
+    return None
+
+
+def extraer_coordenadas_lote(urls):
+    """
+    Versión por lote de extraer_coordenadas: devuelve una lista alineada con
+    `urls`. Cada URL distinta se analiza una sola vez.
+    """
+    vistos = {}
+    resultado = []
+    for url in urls:
+        if url not in vistos:
+            vistos[url] = extraer_coordenadas(url)
+        resultado.append(vistos[url])
+    return resultado
+
+
+def adjuntar_coordenadas_a_registros(registros):
+    """
+    Agrega "coordenadas" a los registros de un scraper cuyo link de mapa ya
+    las contiene, para que no pasen por el geocodificador. Devuelve los registros.
+    """
+    faltantes = [r for r in registros if not r.get("coordenadas") and r.get("mapa")]
+    for registro, coords in zip(faltantes, extraer_coordenadas_lote(r["mapa"] for r in faltantes)):
+        if coords:
+            registro["coordenadas"] = coords
+    return registros
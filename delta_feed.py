@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+
+from output_writer import codificar, escribir_si_cambio
+
+INDICE = "index.json"
+
+
+def directorio_feed():
+    """
+    Un archivo por corrida con cambios: data/deltas/{secuencia}.json, más un
+    index.json. DELTA_FEED_DIR se lee al usarse, después de load_dotenv().
+    """
+    return os.getenv("DELTA_FEED_DIR", "data/deltas")
+
+
+def huella_farmacia(farmacia):
+    contenido = json.dumps(farmacia, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+
+def claves_del_dia(farmacias):
+    """
+    Clave de cada farmacia dentro de su día: (dirección, n), donde n distingue
+    las farmacias repetidas en la misma dirección.
+    """
+    vistas = {}
+    claves = []
+    for farmacia in farmacias:
+        direccion = farmacia.get("direccion")
+        n = vistas.get(direccion, 0)
+        vistas[direccion] = n + 1
+        claves.append((direccion, n))
+    return claves
+
+
+def indexar(data, alcance=None):
+    """
+    Resume `data` (formato de farmacias_turno.json) para compararlo después:
+    la huella de cada farmacia por (mes, localidad, día, dirección, n) y la
+    fuente y confianza de cada (mes, localidad). Hay que llamarlo antes del
+    merge, que modifica el historial en el lugar.
+
+    `alcance` es el conjunto de (mes, localidad) que puede cambiar el merge;
+    si se indica, solo se indexan esos y calcular_delta compara solo esos.
+    """
+    farmacias = {}
+    localidades = {}
+    for mes, locs in data.items():
+        for localidad, contenido in locs.items():
+            if alcance is not None and (mes, localidad) not in alcance:
+                continue
+            localidades[(mes, localidad)] = (contenido.get("fuente"), contenido.get("confianza", 1))
+            for dia, lista in contenido.get("dias", {}).items():
+                for (direccion, n), farmacia in zip(claves_del_dia(lista), lista):
+                    farmacias[(mes, localidad, dia, direccion, n)] = huella_farmacia(farmacia)
+    return {"farmacias": farmacias, "localidades": localidades, "alcance": alcance}
+
+
+def _operacion(op, mes, localidad, dia, direccion, n, **extra):
+    operacion = {"op": op, "mes": mes, "localidad": localidad, "dia": dia, "direccion": direccion}
+    if n:
+        operacion["n"] = n
+    operacion.update(extra)
+    return operacion
+
+
+def calcular_delta(previo, data):
+    """
+    Compara el índice `previo` (de indexar) con `data` y devuelve la lista de
+    operaciones que llevan de uno al otro:
+
+    - {"op": "localidad", mes, localidad, fuente, confianza}: crea la localidad
+      o actualiza su fuente.
+    - {"op": "update", mes, localidad, dia, direccion, [n], farmacia}
+    - {"op": "add", mes, localidad, dia, posicion, farmacia}
+    - {"op": "remove", mes, localidad, dia, direccion, [n]}
+    - {"op": "remove_localidad", mes, localidad}
+
+    Si `previo` se indexó con un alcance, lo que queda afuera no se compara.
+    """
+    farmacias_previas = dict(previo["farmacias"])
+    localidades_previas = dict(previo["localidades"])
+    alcance = previo.get("alcance")
+    operaciones = []
+    for mes, locs in data.items():
+        for localidad, contenido in locs.items():
+            if alcance is not None and (mes, localidad) not in alcance:
+                continue
+            meta = (contenido.get("fuente"), contenido.get("confianza", 1))
+            if localidades_previas.pop((mes, localidad), None) != meta:
+                operaciones.append({"op": "localidad", "mes": mes, "localidad": localidad,
+                                    "fuente": meta[0], "confianza": meta[1]})
+            for dia, lista in contenido.get("dias", {}).items():
+                for posicion, ((direccion, n), farmacia) in enumerate(zip(claves_del_dia(lista), lista)):
+                    huella = farmacias_previas.pop((mes, localidad, dia, direccion, n), None)
+                    if huella is None:
+                        operaciones.append({"op": "add", "mes": mes, "localidad": localidad, "dia": dia,
+                                            "posicion": posicion, "farmacia": farmacia})
+                    elif huella != huella_farmacia(farmacia):
+                        operaciones.append(_operacion("update", mes, localidad, dia, direccion, n, farmacia=farmacia))
+
+    # Lo que quedó en el índice previo ya no está
+    for mes, localidad, dia, direccion, n in farmacias_previas:
+        if (mes, localidad) not in localidades_previas:
+            operaciones.append(_operacion("remove", mes, localidad, dia, direccion, n))
+    for mes, localidad in localidades_previas:
+        operaciones.append({"op": "remove_localidad", "mes": mes, "localidad": localidad})
+    return operaciones
+
+
+def _buscar(farmacias, direccion, n):
+    for idx, (clave, _) in enumerate(zip(claves_del_dia(farmacias), farmacias)):
+        if clave == (direccion, n):
+            return idx
+    raise KeyError((direccion, n))
+
+
+def aplicar_delta(data, delta):
+    """
+    Aplica en el lugar las operaciones de un delta sobre `data` (formato de
+    farmacias_turno.json) y lo devuelve. Dentro de cada día se aplican primero
+    los updates, después los removes y al final los adds en su posición, así
+    las claves (dirección, n) se refieren siempre a la lista anterior. Los días
+    que quedan vacíos se eliminan.
+    """
+    operaciones = delta["operaciones"] if isinstance(delta, dict) else delta
+    tocados = set()
+    for op in operaciones:
+        if op["op"] == "localidad":
+            contenido = data.setdefault(op["mes"], {}).setdefault(op["localidad"], {"dias": {}})
+            contenido["fuente"] = op["fuente"]
+            contenido["confianza"] = op["confianza"]
+            contenido["dias"] = contenido.pop("dias")  # mantiene el orden de las claves del archivo
+
+    for op in operaciones:
+        if op["op"] == "update":
+            farmacias = data[op["mes"]][op["localidad"]]["dias"][op["dia"]]
+            farmacias[_buscar(farmacias, op["direccion"], op.get("n", 0))] = op["farmacia"]
+
+    removes = [op for op in operaciones if op["op"] == "remove"]
+    # De atrás para adelante, para que borrar una no cambie la n de las siguientes
+    for op in sorted(removes, key=lambda op: op.get("n", 0), reverse=True):
+        farmacias = data[op["mes"]][op["localidad"]]["dias"][op["dia"]]
+        del farmacias[_buscar(farmacias, op["direccion"], op.get("n", 0))]
+        tocados.add((op["mes"], op["localidad"], op["dia"]))
+
+    for op in sorted((op for op in operaciones if op["op"] == "add"), key=lambda op: op["posicion"]):
+        dias = data.setdefault(op["mes"], {}).setdefault(op["localidad"], {"dias": {}})["dias"]
+        dias.setdefault(op["dia"], []).insert(op["posicion"], op["farmacia"])
+
+    for mes, localidad, dia in tocados:
+        dias = data[mes][localidad]["dias"]
+        if not dias.get(dia, True):
+            del dias[dia]
+
+    for op in operaciones:
+        if op["op"] == "remove_localidad":
+            data.get(op["mes"], {}).pop(op["localidad"], None)
+            if op["mes"] in data and not data[op["mes"]]:
+                del data[op["mes"]]
+    return data
+
+
+def leer_indice(directorio=None):
+    directorio = directorio or directorio_feed()
+    path = os.path.join(directorio, INDICE)
+    if not os.path.exists(path):
+        return {"version": 1, "ultima": 0, "deltas": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def publicar_delta(previo, data, directorio=None, max_deltas=None):
+    """
+    Calcula el delta entre `previo` (indexar del historial antes del merge) y
+    `data` y, si hay cambios, lo escribe como {secuencia}.json con el número
+    siguiente al último publicado. El index.json lista los deltas disponibles;
+    los que exceden `max_deltas` (DELTA_FEED_MAX, por defecto 200) se borran;
+    un cliente más atrasado baja el archivo completo. Devuelve la lista de
+    archivos escritos o borrados.
+    """
+    directorio = directorio or directorio_feed()
+    if max_deltas is None:
+        max_deltas = int(os.getenv("DELTA_FEED_MAX", "200"))
+    operaciones = calcular_delta(previo, data)
+    if not operaciones:
+        print("[INFO] Feed de cambios: sin cambios respecto de la corrida anterior.")
+        return []
+
+    indice = leer_indice(directorio)
+    secuencia = indice["ultima"] + 1
+    archivo = f"{secuencia:08d}.json"
+    path = os.path.join(directorio, archivo)
+    escribir_si_cambio(path, codificar({"secuencia": secuencia, "anterior": indice["ultima"], "operaciones": operaciones}))
+    cambiados = [path]
+
+    deltas = indice["deltas"] + [{"secuencia": secuencia, "archivo": archivo, "operaciones": len(operaciones)}]
+    for viejo in deltas[:-max_deltas] if max_deltas else []:
+        path_viejo = os.path.join(directorio, viejo["archivo"])
+        if os.path.exists(path_viejo):
+            os.remove(path_viejo)
+            cambiados.append(path_viejo)
+    deltas = deltas[-max_deltas:] if max_deltas else deltas
+
+    indice_path = os.path.join(directorio, INDICE)
+    escribir_si_cambio(indice_path, codificar({"version": 1, "ultima": secuencia, "deltas": deltas}, minificado=False))
+    cambiados.append(indice_path)
+    print(f"[INFO] Feed de cambios: delta {secuencia} con {len(operaciones)} operaciones")
+    return cambiados
+
+
+def aplicar_deltas(data, desde, directorio=None):
+    """
+    Lleva `data`, que está al día hasta la secuencia `desde`, a la última
+    secuencia publicada aplicando los deltas en orden. Devuelve (data,
+    secuencia final). Lanza ValueError si falta algún delta intermedio (el
+    cliente tiene que bajar el archivo completo).
+    """
+    directorio = directorio or directorio_feed()
+    indice = leer_indice(directorio)
+    pendientes = [info for info in indice["deltas"] if info["secuencia"] > desde]
+    esperada = desde + 1
+    for info in pendientes:
+        if info["secuencia"] != esperada:
+            raise ValueError(f"Falta el delta {esperada}: hay que descargar el archivo completo")
+        with open(os.path.join(directorio, info["archivo"]), "r", encoding="utf-8") as f:
+            delta = json.load(f)
+        aplicar_delta(data, delta)
+        esperada += 1
+    if indice["ultima"] > desde and not pendientes:
+        raise ValueError(f"Falta el delta {desde + 1}: hay que descargar el archivo completo")
+    return data, max(desde, indice["ultima"])
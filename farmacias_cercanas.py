@@ -0,0 +1,244 @@
+import datetime
+import heapq
+import json
+import math
+import os
+
+RADIO_TIERRA_KM = 6371.0088
+# Igual que BaseScraper.HORA_CORTE: antes de las 8:30 sigue el turno del día anterior
+HORA_CORTE = (8, 30)
+MESES = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+         "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+
+TURNOS_JSON = "data/farmacias_turno.json"
+FARMACIAS_24H_JSON = "data/farmacias_24_horas.json"
+LOCALIDADES_JSON = "data/localidades.json"
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """
+    Distancia en km sobre la esfera entre dos puntos en grados.
+    """
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def lat_lng(coords):
+    """
+    Devuelve (lat, lng) como float, o None si las coordenadas faltan o no son
+    números (algunos archivos las tienen como strings).
+    """
+    if not coords:
+        return None
+    try:
+        return float(coords["lat"]), float(coords["lng"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class IndiceGrilla:
+    """
+    Índice espacial de grilla: los puntos se agrupan en celdas de `celda`
+    grados de lado. Una búsqueda recorre anillos de celdas alrededor del punto
+    pedido y corta en cuanto ninguna celda sin revisar puede tener algo más
+    cerca que el k-ésimo encontrado, así que solo mide distancias a los puntos
+    vecinos y no a todos.
+    """
+    def __init__(self, celda=0.01):
+        self.celda = celda
+        self._celdas = {}
+        self._cantidad = 0
+        self._limites = None
+
+    def __len__(self):
+        return self._cantidad
+
+    def _clave(self, lat, lng):
+        return math.floor(lat / self.celda), math.floor(lng / self.celda)
+
+    def agregar(self, lat, lng, item):
+        i, j = self._clave(lat, lng)
+        self._celdas.setdefault((i, j), []).append((lat, lng, item))
+        self._cantidad += 1
+        if self._limites is None:
+            self._limites = [i, i, j, j]
+        else:
+            limites = self._limites
+            limites[0], limites[1] = min(limites[0], i), max(limites[1], i)
+            limites[2], limites[3] = min(limites[2], j), max(limites[3], j)
+
+    def _anillo(self, i, j, r):
+        if r == 0:
+            yield i, j
+            return
+        for dj in range(-r, r + 1):
+            yield i - r, j + dj
+            yield i + r, j + dj
+        for di in range(-r + 1, r):
+            yield i + di, j - r
+            yield i + di, j + r
+
+    def cercanos(self, lat, lng, k=5, radio_km=None):
+        """
+        Devuelve hasta k tuplas (distancia_km, item), de la más cercana a la más
+        lejana. Con `radio_km` se descartan las que están más lejos.
+        """
+        if not self._cantidad or k <= 0:
+            return []
+
+        i, j = self._clave(lat, lng)
+        i_min, i_max, j_min, j_max = self._limites
+        r_max = max(i - i_min, i_max - i, j - j_min, j_max - j, 0)
+
+        # Lado de una celda en km: el alto es fijo, el ancho se achica con la latitud
+        alto_km = math.radians(self.celda) * RADIO_TIERRA_KM
+        mejores = []  # heap de (-distancia, contador, item) con los k mejores
+        contador = 0
+
+        def considerar(puntos):
+            nonlocal contador
+            for p_lat, p_lng, item in puntos:
+                distancia = haversine_km(lat, lng, p_lat, p_lng)
+                if radio_km is not None and distancia > radio_km:
+                    continue
+                contador += 1
+                if len(mejores) < k:
+                    heapq.heappush(mejores, (-distancia, contador, item))
+                elif distancia < -mejores[0][0]:
+                    heapq.heapreplace(mejores, (-distancia, contador, item))
+
+        def cota(r):
+            # Cualquier punto fuera de los anillos 0..r está al menos a r celdas de distancia
+            lat_borde = min(abs(lat) + (r + 1) * self.celda, 89.9)
+            return r * min(alto_km, alto_km * math.cos(math.radians(lat_borde)))
+
+        def terminado(r):
+            return (radio_km is not None and cota(r) > radio_km) or (len(mejores) == k and cota(r) >= -mejores[0][0])
+
+        r = 0
+        # Mientras el anillo tenga menos celdas que las ocupadas, recorrerlo es lo más barato
+        while r <= r_max and 8 * r <= len(self._celdas):
+            for celda in self._anillo(i, j, r):
+                puntos = self._celdas.get(celda)
+                if puntos:
+                    considerar(puntos)
+            if terminado(r):
+                return self._resultado(mejores)
+            r += 1
+
+        # Zona dispersa: se recorren solo las celdas ocupadas que faltan, de la más cercana a la más lejana
+        restantes = sorted(
+            (max(abs(ci - i), abs(cj - j)), puntos)
+            for (ci, cj), puntos in self._celdas.items()
+            if max(abs(ci - i), abs(cj - j)) >= r
+        ) if r <= r_max else []
+        for anillo, puntos in restantes:
+            if anillo > r and terminado(anillo - 1):
+                break
+            considerar(puntos)
+        return self._resultado(mejores)
+
+    @staticmethod
+    def _resultado(mejores):
+        return [(-d, item) for d, _, item in sorted(mejores, reverse=True)]
+
+
+def fecha_de_turno(momento=None):
+    """
+    Fecha del turno vigente en `momento` (datetime): antes de la hora de corte
+    corresponde al día anterior.
+    """
+    momento = momento or datetime.datetime.now()
+    hora, minuto = HORA_CORTE
+    if (momento.hour, momento.minute) < (hora, minuto):
+        return (momento - datetime.timedelta(days=1)).date()
+    return momento.date()
+
+
+class BuscadorFarmacias:
+    """
+    Responde "¿cuáles son las farmacias abiertas más cercanas?" a partir de
+    farmacias_turno.json y farmacias_24_horas.json, cargados una sola vez.
+
+    Arma un IndiceGrilla por día de turno (mes, día) con las farmacias de todas
+    las localidades, uno con las farmacias 24 horas y otro con los centros de
+    las localidades.
+    """
+    def __init__(self, turnos=None, farmacias_24h=None, localidades=None, celda=0.01):
+        self.celda = celda
+        self.por_dia = {}
+        self.indice_24h = IndiceGrilla(celda)
+        self.indice_localidades = IndiceGrilla(0.25)
+
+        for mes, locs in (turnos or {}).items():
+            for localidad, contenido in locs.items():
+                for dia, farmacias in contenido.get("dias", {}).items():
+                    try:
+                        clave = (mes.lower(), int(dia))
+                    except ValueError:
+                        continue
+                    indice = self.por_dia.setdefault(clave, IndiceGrilla(celda))
+                    for farmacia in farmacias:
+                        punto = lat_lng(farmacia.get("coordenadas"))
+                        if punto:
+                            indice.agregar(*punto, {**farmacia, "localidad": localidad, "tipo": "turno"})
+
+        for localidad, farmacias in (farmacias_24h or {}).items():
+            for farmacia in farmacias:
+                punto = lat_lng(farmacia.get("coordenadas"))
+                if punto:
+                    self.indice_24h.agregar(*punto, {**farmacia, "localidad": localidad, "tipo": "24h"})
+
+        for provincia, lista in (localidades or {}).items():
+            for localidad in lista:
+                punto = lat_lng(localidad.get("coordenadas"))
+                if punto:
+                    self.indice_localidades.agregar(*punto, localidad["nombre"])
+
+    @classmethod
+    def desde_archivos(cls, turnos_path=TURNOS_JSON, farmacias_24h_path=FARMACIAS_24H_JSON,
+                       localidades_path=LOCALIDADES_JSON, celda=0.01):
+        def cargar(path):
+            if not path or not os.path.exists(path):
+                return {}
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        return cls(cargar(turnos_path), cargar(farmacias_24h_path), cargar(localidades_path), celda)
+
+    def cercanas(self, lat, lng, k=5, momento=None, incluir_24h=True, radio_km=None):
+        """
+        Devuelve las k farmacias abiertas más cercanas a (lat, lng) en
+        `momento` (por defecto, ahora): las de turno de ese día y, si
+        `incluir_24h`, las 24 horas. Cada resultado es el dict de la farmacia
+        con "localidad", "tipo" ("turno" o "24h") y "distancia_km".
+        """
+        fecha = fecha_de_turno(momento)
+        candidatas = []
+        indice = self.por_dia.get((MESES[fecha.month - 1], fecha.day))
+        if indice is not None:
+            candidatas.extend(indice.cercanos(lat, lng, k, radio_km))
+        if incluir_24h:
+            candidatas.extend(self.indice_24h.cercanos(lat, lng, k, radio_km))
+
+        candidatas.sort(key=lambda par: par[0])
+        return [{**item, "distancia_km": round(distancia, 3)} for distancia, item in candidatas[:k]]
+
+    def localidad_mas_cercana(self, lat, lng):
+        resultado = self.indice_localidades.cercanos(lat, lng, 1)
+        return resultado[0][1] if resultado else None
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python farmacias_cercanas.py LAT LNG [K]
+    buscador = BuscadorFarmacias.desde_archivos()
+    lat, lng = float(sys.argv[1]), float(sys.argv[2])
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    print(f"[INFO] Localidad más cercana: {buscador.localidad_mas_cercana(lat, lng)}")
+    for farmacia in buscador.cercanas(lat, lng, k):
+        print(f"{farmacia['distancia_km']:>7.2f} km  [{farmacia['tipo']}] {farmacia['nombre']} - {farmacia['direccion']} ({farmacia['localidad']})")
@@ -0,0 +1,212 @@
+import csv
+import json
+import os
+import re
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+
+from address_normalizer import clave_canonica
+
+# Palabras que indican el tipo de vía y no forman parte del nombre de la calle
+TIPOS_DE_VIA = {"calle", "avenida", "pasaje", "boulevard", "bulevar", "ruta"}
+
+# "<calle> <número>[ ...]": la calle es lo más corto posible antes del primer número de puerta.
+# "25 de mayo 123" -> ("25 de mayo", "123"); "10 1502 esquina 63" -> ("10", "1502")
+RE_CALLE_NUMERO = re.compile(r"^(?P<calle>.+?)\s(?P<numero>\d{1,5})(?:\s|$)")
+
+
+def normalizar_calle(calle):
+    """
+    Clave de una calle: canónica (address_normalizer) y sin el tipo de vía.
+    """
+    palabras = clave_canonica(calle).split()
+    while len(palabras) > 1 and palabras[0] in TIPOS_DE_VIA:
+        palabras = palabras[1:]
+    return " ".join(palabras)
+
+
+def separar_calle_y_numero(direccion):
+    """
+    Devuelve (calle normalizada, número) a partir de una dirección, o None si
+    no tiene número de puerta.
+    """
+    texto = clave_canonica(direccion)
+    palabras = texto.split()
+    while len(palabras) > 1 and palabras[0] in TIPOS_DE_VIA:
+        palabras = palabras[1:]
+    match = RE_CALLE_NUMERO.match(" ".join(palabras))
+    if not match:
+        return None
+    return match.group("calle"), int(match.group("numero"))
+
+
+class Gazetteer:
+    """
+    Geocodificador offline a partir de un extracto local de calles.
+
+    Cada calle se guarda como una lista de tramos (desde, hasta, lat1, lng1,
+    lat2, lng2) ordenada por el número inicial, indexada por (localidad, calle)
+    normalizadas. Una consulta es un acceso a dict más una búsqueda binaria, y
+    la posición se interpola linealmente dentro del tramo.
+    """
+    def __init__(self):
+        self._tramos = defaultdict(list)
+        self._inicios = {}
+        self._localidades_por_calle = defaultdict(set)
+
+    def __len__(self):
+        return sum(len(tramos) for tramos in self._tramos.values())
+
+    def agregar_tramo(self, calle, localidad, desde, hasta, lat1, lng1, lat2=None, lng2=None):
+        """
+        Agrega un tramo de calle. Sin (lat2, lng2) el tramo es un punto (una
+        sola dirección, desde == hasta).
+        """
+        if lat2 is None or lng2 is None:
+            lat2, lng2 = lat1, lng1
+        desde, hasta = int(desde), int(hasta)
+        if desde > hasta:
+            desde, hasta, lat1, lng1, lat2, lng2 = hasta, desde, lat2, lng2, lat1, lng1
+        clave = (clave_canonica(localidad), normalizar_calle(calle))
+        self._tramos[clave].append((desde, hasta, float(lat1), float(lng1), float(lat2), float(lng2)))
+        self._localidades_por_calle[clave[1]].add(clave[0])
+        self._inicios.pop(clave, None)
+
+    def _indice(self, clave):
+        inicios = self._inicios.get(clave)
+        if inicios is None:
+            self._tramos[clave].sort()
+            inicios = self._inicios[clave] = [tramo[0] for tramo in self._tramos[clave]]
+        return inicios
+
+    def preparar(self):
+        """
+        Ordena todos los tramos. Es opcional: si no se llama, cada calle se
+        ordena la primera vez que se consulta.
+        """
+        for clave in list(self._tramos):
+            self._indice(clave)
+        return self
+
+    def _interpolar(self, clave, numero):
+        tramos = self._tramos.get(clave)
+        if not tramos:
+            return None
+        inicios = self._indice(clave)
+        # Los tramos pueden superponerse (una mano de cada lado): se revisan hacia atrás
+        i = bisect_right(inicios, numero) - 1
+        while i >= 0:
+            desde, hasta, lat1, lng1, lat2, lng2 = tramos[i]
+            if desde <= numero <= hasta:
+                t = (numero - desde) / (hasta - desde) if hasta > desde else 0.0
+                return {"lat": round(lat1 + t * (lat2 - lat1), 7), "lng": round(lng1 + t * (lng2 - lng1), 7)}
+            i -= 1
+        return None
+
+    def buscar(self, direccion, localidad=None):
+        """
+        Devuelve {"lat", "lng"} para la dirección, o None si el gazetteer no la
+        puede resolver. Sin `localidad`, solo responde si la calle existe en una
+        única localidad del extracto.
+        """
+        partes = separar_calle_y_numero(direccion)
+        if partes is None:
+            return None
+        calle, numero = partes
+
+        if localidad:
+            return self._interpolar((clave_canonica(localidad), calle), numero)
+
+        localidades = self._localidades_por_calle.get(calle, ())
+        if len(localidades) == 1:
+            return self._interpolar((next(iter(localidades)), calle), numero)
+        return None
+
+    def cargar_csv(self, path):
+        """
+        Carga un CSV con columnas calle, localidad, desde, hasta, lat, lng y,
+        opcionalmente, lat_hasta, lng_hasta (el otro extremo del tramo).
+        """
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for fila in csv.DictReader(f):
+                self.agregar_tramo(
+                    fila["calle"], fila["localidad"], fila["desde"], fila.get("hasta") or fila["desde"],
+                    fila["lat"], fila["lng"], fila.get("lat_hasta") or None, fila.get("lng_hasta") or None,
+                )
+        return self
+
+    def cargar_geojson(self, path):
+        """
+        Carga un GeoJSON derivado de OSM:
+        - Point con addr:street, addr:housenumber y addr:city (direcciones sueltas).
+        - LineString con calle/name, desde, hasta y localidad (tramos interpolables).
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            features = json.load(f).get("features", [])
+
+        for feature in features:
+            geometria = feature.get("geometry") or {}
+            props = feature.get("properties") or {}
+            coordenadas = geometria.get("coordinates")
+            if not coordenadas:
+                continue
+
+            if geometria.get("type") == "Point":
+                numero = re.match(r"\d+", str(props.get("addr:housenumber", "")))
+                calle, localidad = props.get("addr:street"), props.get("addr:city")
+                if numero and calle and localidad:
+                    lng, lat = coordenadas[:2]
+                    self.agregar_tramo(calle, localidad, numero.group(), numero.group(), lat, lng)
+            elif geometria.get("type") == "LineString":
+                calle = props.get("calle") or props.get("name")
+                localidad = props.get("localidad")
+                if calle and localidad and props.get("desde") is not None and props.get("hasta") is not None:
+                    # GeoJSON guarda [lng, lat]
+                    (lng1, lat1), (lng2, lat2) = coordenadas[0][:2], coordenadas[-1][:2]
+                    self.agregar_tramo(calle, localidad, props["desde"], props["hasta"], lat1, lng1, lat2, lng2)
+        return self
+
+    @classmethod
+    def desde_archivo(cls, path):
+        gazetteer = cls()
+        if path.lower().endswith((".geojson", ".json")):
+            gazetteer.cargar_geojson(path)
+        else:
+            gazetteer.cargar_csv(path)
+        return gazetteer.preparar()
+
+
+_gazetteer = None
+_gazetteer_cargado = False
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """
+    Devuelve el Gazetteer compartido, cargado la primera vez desde
+    GAZETTEER_PATH (extracto de calles en CSV o GeoJSON), o None si no hay uno
+    configurado. La variable se lee acá y no al importar el módulo, para que
+    tome el valor del .env (load_dotenv corre después de los imports).
+    """
+    global _gazetteer, _gazetteer_cargado
+    if not _gazetteer_cargado:
+        with _gazetteer_lock:
+            if not _gazetteer_cargado:
+                path = os.getenv("GAZETTEER_PATH", "")
+                if path and os.path.exists(path):
+                    _gazetteer = Gazetteer.desde_archivo(path)
+                    print(f"[INFO] Gazetteer cargado desde {path}: {len(_gazetteer)} tramos")
+                elif path:
+                    print(f"[ADVERTENCIA] No se encontró el gazetteer {path}, se usa solo Google Maps.")
+                _gazetteer_cargado = True
+    return _gazetteer
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python gazetteer.py archivo.csv|archivo.geojson "direccion" [localidad]
+    gazetteer = Gazetteer.desde_archivo(sys.argv[1])
+    print(f"[INFO] {len(gazetteer)} tramos cargados")
+    print(gazetteer.buscar(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None))
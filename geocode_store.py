@@ -0,0 +1,255 @@
+import glob
+import json
+import os
+import sqlite3
+import threading
+
+from address_normalizer import clave_canonica, direcciones_del_corpus
+from output_writer import codificar, escribir_si_cambio
+
+DB_FILE = "coordenadas_cache.db"
+JSON_FILE = "coordenadas_cache.json"
+# Archivos de donde se toma la localidad de cada dirección al migrar las claves
+# (patrones de glob, todos con el formato de farmacias_turno.json)
+CORPUS_LOCALIDADES = ["data/farmacias_turno.json", "data/old/*.json", "sources/*.json"]
+
+
+class GeocodeStore:
+    """
+    Cache persistente de coordenadas en SQLite (modo WAL).
+
+    Reemplaza a coordenadas_cache.json: las búsquedas son por índice, cada
+    inserción es una transacción chica y varios threads o procesos pueden
+    leer y escribir a la vez. Cada thread usa su propia conexión.
+    """
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._crear_tablas()
+
+    def _conexion(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # timeout: cuánto esperar si otro proceso tiene tomada la escritura
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _crear_tablas(self):
+        with self._conexion() as conn:
+            # La misma dirección puede estar en varias localidades ("San Martín 100"
+            # de Azul y de Bolívar), así que la localidad es parte de la clave
+            # primaria; "" es una localidad desconocida.
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS coordenadas (
+                    direccion TEXT NOT NULL,
+                    localidad TEXT NOT NULL DEFAULT '',
+                    lat REAL,
+                    lng REAL,
+                    clave TEXT,
+                    PRIMARY KEY (direccion, localidad)
+                )
+            """)
+            columnas = {fila[1] for fila in conn.execute("PRAGMA table_info(coordenadas)")}
+            if "localidad" not in columnas:
+                self._migrar_tabla(conn, "clave" in columnas)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_coordenadas_clave ON coordenadas (clave)")
+
+    @staticmethod
+    def _migrar_tabla(conn, tiene_clave):
+        """
+        Bases creadas cuando la clave primaria era solo la dirección: se
+        rearma la tabla con la localidad desconocida en todas las filas.
+        """
+        clave = "clave" if tiene_clave else "NULL"
+        conn.execute("ALTER TABLE coordenadas RENAME TO coordenadas_anterior")
+        conn.execute("DROP INDEX IF EXISTS idx_coordenadas_clave")
+        conn.execute("""
+            CREATE TABLE coordenadas (
+                direccion TEXT NOT NULL,
+                localidad TEXT NOT NULL DEFAULT '',
+                lat REAL,
+                lng REAL,
+                clave TEXT,
+                PRIMARY KEY (direccion, localidad)
+            )
+        """)
+        conn.execute(f"""
+            INSERT INTO coordenadas (direccion, localidad, lat, lng, clave)
+            SELECT direccion, '', lat, lng, {clave} FROM coordenadas_anterior ORDER BY rowid
+        """)
+        conn.execute("DROP TABLE coordenadas_anterior")
+
+    def get(self, direccion, localidad=None):
+        """
+        Devuelve {"lat", "lng"} si la dirección está en el cache para esa
+        localidad (o con la localidad desconocida si no se indica), o None.
+        """
+        fila = self._conexion().execute(
+            "SELECT lat, lng FROM coordenadas WHERE direccion = ? AND localidad = ?", (direccion, localidad or "")
+        ).fetchone()
+        if fila is None:
+            return None
+        return {"lat": fila[0], "lng": fila[1]}
+
+    def get_por_clave(self, clave, localidad=None):
+        consulta = "SELECT lat, lng FROM coordenadas WHERE clave = ?"
+        parametros = [clave]
+        if localidad is not None:
+            consulta += " AND localidad = ?"
+            parametros.append(localidad)
+        fila = self._conexion().execute(consulta + " LIMIT 1", parametros).fetchone()
+        if fila is None:
+            return None
+        return {"lat": fila[0], "lng": fila[1]}
+
+    def buscar(self, direccion, localidad=None):
+        """
+        Busca la dirección literal y, si no está, por su clave canónica.
+        Devuelve {"lat", "lng"} o None.
+
+        Con `localidad` se buscan primero las filas de esa localidad (la clave
+        canónica la incluye) y después las guardadas sin localidad conocida,
+        que no pueden ser de otra ciudad. Una dirección repetida en otra
+        localidad nunca se confunde con esta.
+        """
+        coords = self.get(direccion, localidad)
+        if coords is None:
+            coords = self.get_por_clave(clave_canonica(direccion, localidad))
+        if coords is None and localidad:
+            coords = self.get(direccion) or self.get_por_clave(clave_canonica(direccion), localidad="")
+        return coords
+
+    def __contains__(self, direccion):
+        return self._conexion().execute(
+            "SELECT 1 FROM coordenadas WHERE direccion = ? LIMIT 1", (direccion,)
+        ).fetchone() is not None
+
+    def __len__(self):
+        return self._conexion().execute("SELECT COUNT(*) FROM coordenadas").fetchone()[0]
+
+    def set(self, direccion, coords, localidad=None):
+        self.set_many([(direccion, coords, localidad)])
+
+    def set_many(self, items):
+        """
+        Inserta o reemplaza varias (direccion, coords) o (direccion, coords, localidad)
+        en una sola transacción.
+        """
+        filas = []
+        for direccion, coords, *resto in items:
+            localidad = resto[0] if resto else None
+            filas.append((direccion, localidad or "", coords.get("lat"), coords.get("lng"),
+                          clave_canonica(direccion, localidad)))
+        with self._conexion() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO coordenadas (direccion, localidad, lat, lng, clave) VALUES (?, ?, ?, ?, ?)",
+                filas,
+            )
+
+    def migrar_claves(self, localidades=None, solo_faltantes=True):
+        """
+        Calcula la clave canónica de las filas existentes. `localidades` es un
+        dict direccion -> localidad para las direcciones cuya localidad se conoce;
+        las filas guardadas sin localidad toman esa. Con `solo_faltantes` se
+        procesan las filas sin clave y las sin localidad que ahora se conoce.
+        """
+        localidades = localidades or {}
+        consulta = "SELECT direccion, localidad, clave FROM coordenadas"
+        if solo_faltantes:
+            consulta += " WHERE clave IS NULL OR localidad = ''"
+        filas = [
+            (direccion, localidad) for direccion, localidad, clave in self._conexion().execute(consulta)
+            if not solo_faltantes or clave is None or (not localidad and direccion in localidades)
+        ]
+        with self._conexion() as conn:
+            for direccion, localidad in filas:
+                nueva = localidad or localidades.get(direccion) or ""
+                if nueva == localidad:
+                    conn.execute(
+                        "UPDATE coordenadas SET clave = ? WHERE direccion = ? AND localidad = ?",
+                        (clave_canonica(direccion, nueva or None), direccion, localidad),
+                    )
+                    continue
+                actualizada = conn.execute(
+                    "UPDATE OR IGNORE coordenadas SET localidad = ?, clave = ? WHERE direccion = ? AND localidad = ?",
+                    (nueva, clave_canonica(direccion, nueva), direccion, localidad),
+                ).rowcount
+                if not actualizada:
+                    # Ya había una fila de esa localidad: la que no la tenía sobra
+                    conn.execute("DELETE FROM coordenadas WHERE direccion = ? AND localidad = ?", (direccion, localidad))
+        return len(filas)
+
+    def items(self):
+        cursor = self._conexion().execute("SELECT direccion, lat, lng FROM coordenadas ORDER BY rowid")
+        for direccion, lat, lng in cursor:
+            yield direccion, {"lat": lat, "lng": lng}
+
+    def importar_json(self, json_path=JSON_FILE):
+        """
+        Importa un coordenadas_cache.json. Devuelve la cantidad de direcciones importadas.
+        """
+        with open(json_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        self.set_many(cache.items())
+        return len(cache)
+
+    def exportar_json(self, json_path=JSON_FILE):
+        """
+        Escribe el cache en el formato de coordenadas_cache.json, para compatibilidad,
+        solo si cambió. Devuelve (cantidad de direcciones, si se escribió el archivo).
+        """
+        cache = dict(self.items())
+        escrito = escribir_si_cambio(json_path, codificar(cache, minificado=False))
+        return len(cache), escrito
+
+
+def localidades_conocidas():
+    """
+    Devuelve un dict direccion -> localidad a partir de los datos ya publicados.
+    """
+    existentes = [path for patron in CORPUS_LOCALIDADES for path in sorted(glob.glob(patron))]
+    localidades = {}
+    for direccion, localidad in direcciones_del_corpus(existentes):
+        # Ante direcciones en varios archivos gana la primera, que es la de los datos actuales
+        localidades.setdefault(direccion, localidad)
+    return localidades
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Devuelve el GeocodeStore compartido. La primera vez que se crea la base,
+    importa el coordenadas_cache.json existente.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = GeocodeStore()
+                if len(store) == 0 and os.path.exists(JSON_FILE):
+                    cantidad = store.importar_json(JSON_FILE)
+                    print(f"[INFO] Se importaron {cantidad} direcciones de {JSON_FILE} a {DB_FILE}")
+                    # Las claves se recalculan con la localidad de cada dirección, si se conoce
+                    store.migrar_claves(localidades_conocidas(), solo_faltantes=False)
+                elif store.migrar_claves(localidades_conocidas()):
+                    print(f"[INFO] Se calcularon las claves canónicas del cache de coordenadas")
+                _store = store
+    return _store
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python geocode_store.py importar|exportar [archivo.json]
+    accion = sys.argv[1] if len(sys.argv) > 1 else "exportar"
+    archivo = sys.argv[2] if len(sys.argv) > 2 else JSON_FILE
+    if accion == "importar":
+        print(f"[INFO] Importadas {GeocodeStore().importar_json(archivo)} direcciones desde {archivo}")
+    else:
+        print(f"[INFO] Exportadas {get_store().exportar_json(archivo)[0]} direcciones a {archivo}")
@@ -1,5 +1,8 @@
+import atexit
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import threading
 import time
 import urllib.parse
 import re
@@ -8,19 +11,28 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from chromedriver_py import binary_path  # pip install chromedriver-py
+import requests
+from tqdm import tqdm
+
+from chrome_pool import DriverPool
+from address_normalizer import clave_canonica
+from coordenadas import extraer_coordenadas
+from gazetteer import get_gazetteer
+from scrapers.http_client import get_session
+from geocode_store import get_store, JSON_FILE as CACHE_FILE
+from output_writer import escribir_salida
+import metrics
 
-CACHE_FILE = "coordenadas_cache.json"
 FARMACIAS_24H_JSON = "data/farmacias_24_horas.json"
 
-def cargar_cache():
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-def guardar_cache(cache):
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache, f, indent=2, ensure_ascii=False)
+def exportar_cache():
+    """
+    Regenera coordenadas_cache.json desde la base SQLite, para quien siga leyendo el JSON.
+    Devuelve la lista de archivos escritos (vacía si no cambió).
+    """
+    cantidad, escrito = get_store().exportar_json(CACHE_FILE)
+    print(f"[INFO] Cache de coordenadas exportado a {CACHE_FILE} ({cantidad} direcciones)")
+    return [CACHE_FILE] if escrito else []
 
 def crear_driver():
     chrome_options = Options()
@@ -36,106 +48,313 @@ def crear_driver():
     service = Service(executable_path=binary_path)
     return webdriver.Chrome(service=service, options=chrome_options)
 
-import re
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_driver_pool():
+    """
+    Devuelve el pool de navegadores compartido. GEOCODER_WORKERS define cuántos
+    Chrome pueden usarse en paralelo y GEOCODER_MAX_PAGINAS cada cuántas páginas
+    se recicla un navegador.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DriverPool(
+                    crear_driver,
+                    tamaño=int(os.getenv("GEOCODER_WORKERS", "1")),
+                    max_paginas=int(os.getenv("GEOCODER_MAX_PAGINAS", "50")),
+                )
+                atexit.register(_pool.cerrar)
+    return _pool
+
+# Coordenadas del lugar buscado (no del centro del mapa): la URL ya está resuelta
+RE_COORDS_LUGAR = re.compile(r"!3d-?\d+\.\d+!4d-?\d+\.\d+")
+
+def esperar_url_con_coordenadas(driver, timeout, estable=1.5):
+    """
+    Espera a que la URL del navegador se asiente en un patrón de coordenadas,
+    en lugar de dormir un tiempo fijo. Termina cuando aparece !3d...!4d, cuando
+    la URL tiene coordenadas y no cambia durante `estable` segundos, o al llegar a `timeout`.
+    """
+    inicio = time.monotonic()
+    ultima_url = None
+    desde = inicio
+    while True:
+        url = driver.current_url
+        ahora = time.monotonic()
+        if RE_COORDS_LUGAR.search(url):
+            return url
+        if url != ultima_url:
+            ultima_url, desde = url, ahora
+        elif ahora - desde >= estable and extraer_coordenadas_desde_url(url):
+            return url
+        if ahora - inicio >= timeout:
+            return url
+        time.sleep(0.2)
 
 def extraer_coordenadas_desde_url(url):
-    try:
-        # Patrón prioritario: !3dLAT!4dLNG → coordenadas reales del lugar
-        match_real_coords = re.search(r"!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)", url)
-        if match_real_coords:
-            lat = float(match_real_coords.group(1))
-            lng = float(match_real_coords.group(2))
-            return {"lat": lat, "lng": lng}
-
-        # Patrón embed: !2dLNG!3dLAT
-        match_embed = re.search(r"!2d(-?\d+\.\d+)!3d(-?\d+\.\d+)", url)
-        if match_embed:
-            lng = float(match_embed.group(1))
-            lat = float(match_embed.group(2))
-            return {"lat": lat, "lng": lng}
-
-        # Patrón en parámetros: destination=LAT,LNG
-        match_dest = re.search(r"[?&]destination=(-?\d+\.\d+),(-?\d+\.\d+)", url)
-        if match_dest:
-            lat = float(match_dest.group(1))
-            lng = float(match_dest.group(2))
-            return {"lat": lat, "lng": lng}
-
-        # Patrón visual del mapa: /@LAT,LNG,...
-        if "/@" in url:
-            at_index = url.find("/@")
-            partes = url[at_index + 2:].split(",")
-            if len(partes) >= 2:
-                lat = float(partes[0])
-                lng = float(partes[1])
-                return {"lat": lat, "lng": lng}
-
-        # Fallback: cualquier lat/lng suelto, por ejemplo -34.x, -58.x o -34.x, -60.x
-        match_fallback = re.search(r"(-3\d+\.\d+),(-5\d+\.\d+)", url)
-        if match_fallback:
-            lat = float(match_fallback.group(1))
-            lng = float(match_fallback.group(2))
-            return {"lat": lat, "lng": lng}
-        
-        match_fallback = re.search(r"(-3\d+\.\d+),(-6\d+\.\d+)", url)
-        if match_fallback:
-            lat = float(match_fallback.group(1))
-            lng = float(match_fallback.group(2))
-            return {"lat": lat, "lng": lng}
-
-        return None
-    except Exception as e:
-        print(f"[ERROR] No se pudo extraer coordenadas: {e}")
+    """Extrae {"lat", "lng"} de un link de mapa con los patrones precompilados de coordenadas.py."""
+    return extraer_coordenadas(url)
+
+# Redirecciones que se siguen por link (goo.gl/maps, maps.app.goo.gl, consent, etc.)
+MAX_REDIRECCIONES = 8
+# Acortadores cuyo link redirige por HTTP a la página del lugar
+HOSTS_ACORTADORES = {"goo.gl", "maps.app.goo.gl", "g.co", "bit.ly"}
+# Coordenadas del lugar dentro del HTML de una página /maps/place/ ya resuelta
+RE_COORDS_LUGAR_HTML = re.compile(r"!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)")
+HEADERS_MAPAS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept-Language": "es-AR,es;q=0.9",
+}
+
+def es_pagina_de_lugar(url):
+    return "/maps/place/" in urllib.parse.urlsplit(url).path
+
+def se_resuelve_por_http(url):
+    """
+    Solo vale la pena pedir por HTTP los links acortados (redirigen al lugar)
+    y las páginas /maps/place/. Una búsqueda (/maps/search/) o un iframe
+    embebido no redirige y el primer pin de su HTML no es necesariamente el
+    lugar buscado.
+    """
+    host = urllib.parse.urlsplit(url).netloc.lower()
+    return host in HOSTS_ACORTADORES or es_pagina_de_lugar(url)
+
+def resolver_url_por_http(mapa_url, session=None, max_redirecciones=MAX_REDIRECCIONES):
+    """
+    Sigue las redirecciones de un link de Google Maps con el cliente HTTP
+    compartido y prueba extraer_coordenadas_desde_url en cada salto. Si la
+    última página no redirige y es una página /maps/place/, busca el patrón
+    !3d...!4d en su HTML. Devuelve {"lat", "lng"} o None, sin abrir un navegador.
+
+    Solo se confía en coordenadas de saltos de redirección y de páginas de un
+    lugar: los links de búsqueda y los embebidos no se piden (ver
+    se_resuelve_por_http), porque adivinar el pin desde su HTML puede dar
+    otro lugar y el resultado queda guardado en el cache como exacto.
+    """
+    coords = extraer_coordenadas_desde_url(mapa_url)
+    if coords:
+        return coords
+    if not se_resuelve_por_http(mapa_url):
         return None
 
+    session = session or get_session()
+    url = mapa_url
+    for _ in range(max_redirecciones + 1):
+        try:
+            response = session.get(url, headers=HEADERS_MAPAS, allow_redirects=False, timeout=(5, 10))
+        except requests.exceptions.RequestException as e:
+            print(f"[ADVERTENCIA] No se pudo seguir el link del mapa {url}: {e}")
+            return None
+
+        destino = response.headers.get("Location")
+        if response.is_redirect and destino:
+            url = urllib.parse.urljoin(url, destino)
+            coords = extraer_coordenadas_desde_url(url)
+            if coords:
+                return coords
+            continue
 
-
-
-
-def obtener_coordenadas(direccion, delay=5):
-    """Usa un WebDriver para buscar la dirección en Google Maps y devuelve coordenadas."""
+        if response.ok and es_pagina_de_lugar(url):
+            match = RE_COORDS_LUGAR_HTML.search(response.text)
+            if match:
+                return {"lat": float(match.group(1)), "lng": float(match.group(2))}
+        return None
+    return None
+
+def resolver_urls_por_http(urls, workers=None):
+    """
+    Resuelve muchos links de mapa en paralelo con resolver_url_por_http.
+    Devuelve un dict url -> coords (o None). MAP_RESOLVER_WORKERS define el paralelismo.
+    """
+    urls = list(dict.fromkeys(urls))
+    workers = workers or int(os.getenv("MAP_RESOLVER_WORKERS", "8"))
+    resultado = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futuros = {executor.submit(resolver_url_por_http, url): url for url in urls}
+        for futuro in tqdm(as_completed(futuros), total=len(futuros), desc="Resolviendo links de mapa"):
+            url = futuros[futuro]
+            try:
+                resultado[url] = futuro.result()
+            except Exception as e:
+                print(f"[ERROR] Falló la resolución del link {url}: {e}")
+                resultado[url] = None
+    return resultado
+
+def obtener_coordenadas(direccion, timeout=10):
+    """Usa un WebDriver del pool para buscar la dirección en Google Maps y devuelve coordenadas."""
     print(f"[BUSCANDO] {direccion}")
     query = urllib.parse.quote(direccion)
     url = f"https://www.google.com/maps/search/?api=1&query={query}"
 
-    driver = crear_driver()
-    try:
-        driver.get(url)
-        time.sleep(delay)
-        final_url = driver.current_url
-        coords = extraer_coordenadas_desde_url(final_url)
-        if coords:
-            print(f"[✓] Coordenadas: {coords}")
-            return coords
-        else:
-            print("[✗] No se encontraron coordenadas")
-            return {"lat": None, "lng": None}
-    finally:
-        driver.quit()
-
-def consultar_coordenadas(direccion, mapa_url):
-    """Consulta coordenadas de una dirección, primero desde la URL si contiene @lat,lng, si no, recurre a Selenium."""
-    cache = cargar_cache()
-
-    if direccion in cache:
+    with get_driver_pool().driver() as driver:
+        # Se mide después de obtener el driver: la espera por el pool no es tiempo de Selenium
+        with metrics.etapa("geocode.selenium"):
+            driver.get(url)
+            final_url = esperar_url_con_coordenadas(driver, timeout)
+    coords = extraer_coordenadas_desde_url(final_url)
+    if coords:
+        print(f"[✓] Coordenadas: {coords}")
+        return coords
+    else:
+        print("[✗] No se encontraron coordenadas")
+        return {"lat": None, "lng": None}
+
+def consultar_coordenadas(direccion, mapa_url, localidad=None):
+    """
+    Consulta coordenadas de una dirección: primero en el cache, después desde la URL
+    si contiene @lat,lng o redirige a una que las contenga, después en el gazetteer
+    offline y, si no, recurre a Selenium.
+    """
+    store = get_store()
+
+    cached = store.buscar(direccion, localidad)
+    if cached is not None:
         print(f"[CACHE] Coordenadas ya guardadas para: {direccion}")
-        return cache[direccion]
+        return cached
 
     # Paso 1: Intentar extraer coordenadas directamente de la URL
     if mapa_url:
         coords = extraer_coordenadas_desde_url(mapa_url)
         if coords and coords["lat"] is not None and coords["lng"] is not None:
             print(f"[✓] Coordenadas extraídas desde mapa_url: {coords}")
-            cache[direccion] = coords
-            guardar_cache(cache)
+            store.set(direccion, coords, localidad)
+            return coords
+
+        # Paso 2: Seguir las redirecciones del link por HTTP, sin abrir un navegador
+        coords = resolver_url_por_http(mapa_url)
+        if coords:
+            print(f"[HTTP] Coordenadas resueltas desde el link del mapa: {coords}")
+            store.set(direccion, coords, localidad)
             return coords
 
-    # Paso 2: Usar Selenium si no se pudo extraer
-    coords = obtener_coordenadas(direccion)
-    cache[direccion] = coords
-    guardar_cache(cache)
+    # Paso 3: Buscar en el gazetteer offline, si hay uno configurado
+    gazetteer = get_gazetteer()
+    coords = gazetteer.buscar(direccion, localidad) if gazetteer else None
+    if coords:
+        print(f"[GAZETTEER] Coordenadas para {direccion}: {coords}")
+        return coords
+
+    # Paso 4: Usar Selenium si no se pudo resolver sin navegador
+    coords = obtener_coordenadas(consulta_de_busqueda(direccion, localidad))
+    store.set(direccion, coords, localidad)
     return coords
 
+def consulta_de_busqueda(direccion, localidad):
+    """
+    Texto a buscar en Google Maps: la dirección, con la localidad al final si
+    no la menciona ("San Martín 123" de Azul -> "San Martín 123, Azul").
+    """
+    if localidad and clave_canonica(direccion, localidad) != clave_canonica(direccion):
+        return f"{direccion}, {localidad}"
+    return direccion
+
+def consultar_coordenadas_lote(pedidos, workers=None):
+    """
+    Resuelve en un solo paso las coordenadas de muchas direcciones.
+
+    `pedidos` es un iterable de (direccion, mapa_url, localidad). Devuelve un dict
+    (direccion, localidad) -> coords: la misma calle puede estar en dos localidades. Las direcciones se agrupan por su clave canónica
+    (address_normalizer) y cada grupo se busca una sola vez: primero en el
+    cache, después en la URL del mapa, después siguiendo las redirecciones del
+    link por HTTP, después en el gazetteer offline (si hay uno configurado), y
+    las que quedan con Selenium en paralelo (hasta `workers` navegadores, por
+    defecto GEOCODER_WORKERS).
+    """
+    store = get_store()
+    gazetteer = get_gazetteer()
+    workers = workers or int(os.getenv("GEOCODER_WORKERS", "1"))
+
+    # Agrupar por clave canónica, conservando la primera URL de mapa no vacía
+    grupos = {}
+    for direccion, mapa_url, localidad in pedidos:
+        clave = clave_canonica(direccion, localidad)
+        grupo = grupos.setdefault(clave, {"pedidos": {}, "mapa": None})
+        grupo["pedidos"].setdefault((direccion, localidad), None)
+        grupo["mapa"] = grupo["mapa"] or mapa_url
+
+    resultado = {}
+    sin_resolver = {}
+    desde_url = 0
+    for clave, grupo in grupos.items():
+        coords = next((c for c in (store.buscar(d, l) for d, l in grupo["pedidos"]) if c is not None), None)
+        if coords is None and grupo["mapa"]:
+            coords = extraer_coordenadas_desde_url(grupo["mapa"])
+            if coords and coords["lat"] is not None and coords["lng"] is not None:
+                store.set_many((d, coords, l) for d, l in grupo["pedidos"])
+                desde_url += 1
+            else:
+                coords = None
+        if coords is None:
+            sin_resolver[clave] = grupo
+        else:
+            for pedido in grupo["pedidos"]:
+                resultado[pedido] = coords
+    en_cache = len(grupos) - len(sin_resolver) - desde_url
+
+    # Links de mapa que redirigen a una URL con coordenadas: se siguen por HTTP, sin navegador
+    desde_http = 0
+    urls = {grupo["mapa"] for grupo in sin_resolver.values() if grupo["mapa"] and se_resuelve_por_http(grupo["mapa"])}
+    if urls:
+        with metrics.etapa("geocode.http"):
+            resueltas = resolver_urls_por_http(urls)
+        for clave, grupo in list(sin_resolver.items()):
+            coords = resueltas.get(grupo["mapa"])
+            if coords:
+                store.set_many((d, coords, l) for d, l in grupo["pedidos"])
+                for pedido in grupo["pedidos"]:
+                    resultado[pedido] = coords
+                del sin_resolver[clave]
+                desde_http += 1
+
+    pendientes = {}
+    desde_gazetteer = 0
+    for clave, grupo in sin_resolver.items():
+        # No se guarda en el cache: es una aproximación y cuesta microsegundos recalcularla
+        coords = None
+        if gazetteer:
+            coords = next((c for c in (gazetteer.buscar(d, l) for d, l in grupo["pedidos"]) if c), None)
+        if coords is None:
+            pendientes[clave] = grupo
+        else:
+            desde_gazetteer += 1
+            for pedido in grupo["pedidos"]:
+                resultado[pedido] = coords
+
+    metrics.sumar("geocode.cache_aciertos", en_cache)
+    metrics.sumar("geocode.cache_fallos", len(grupos) - en_cache)
+    metrics.sumar("geocode.desde_url", desde_url)
+    metrics.sumar("geocode.desde_http", desde_http)
+    metrics.sumar("geocode.desde_gazetteer", desde_gazetteer)
+    metrics.sumar("geocode.selenium_busquedas", len(pendientes))
+    print(f"[INFO] Geocodificación: {len(grupos)} direcciones únicas, {en_cache} en cache, "
+          f"{desde_url} desde la URL del mapa, {desde_http} siguiendo el link por HTTP, "
+          f"{desde_gazetteer} desde el gazetteer, {len(pendientes)} a buscar con Selenium ({workers} en paralelo)")
+
+    if pendientes:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Se busca con la primera dirección original del grupo, que tiene más contexto que la clave
+            futuros = {executor.submit(obtener_coordenadas, consulta_de_busqueda(*next(iter(grupo["pedidos"])))): grupo
+                       for grupo in pendientes.values()}
+            # tqdm muestra el avance y el tiempo estimado restante
+            for futuro in tqdm(as_completed(futuros), total=len(futuros), desc="Geocodificando"):
+                grupo = futuros[futuro]
+                try:
+                    coords = futuro.result()
+                except Exception as e:
+                    # Un error del navegador no es un "no encontrado": no se guarda, se reintenta la próxima corrida
+                    print(f"[ERROR] Falló la búsqueda de coordenadas: {e}")
+                    coords = {"lat": None, "lng": None}
+                else:
+                    # Se guarda cada resultado apenas llega, para no perderlo si la corrida se corta
+                    store.set_many((d, coords, l) for d, l in grupo["pedidos"])
+                for pedido in grupo["pedidos"]:
+                    resultado[pedido] = coords
+
+    return resultado
+
 def añadir_coordenadas_a_farmacias_24h():
     """Agrega coordenadas a cada farmacia del archivo 24h usando el campo 'mapa' con Selenium."""
     if not os.path.exists(FARMACIAS_24H_JSON):
@@ -146,7 +365,7 @@ def añadir_coordenadas_a_farmacias_24h():
         data = json.load(f)
 
     cambios = False
-    cache = cargar_cache()
+    store = get_store()
 
     for localidad, farmacias in data.items():
         for farmacia in farmacias:
@@ -157,43 +376,39 @@ def añadir_coordenadas_a_farmacias_24h():
                 print(f"[ADVERTENCIA] No hay URL de mapa para: {direccion}")
                 continue
 
-            if direccion in cache:
+            cached = store.buscar(direccion, localidad)
+            if cached is not None:
                 print(f"[CACHE] Coordenadas ya guardadas para: {direccion}")
-                farmacia["coordenadas"] = cache[direccion]
+                farmacia["coordenadas"] = cached
                 continue
 
-            coords = extraer_coordenadas_desde_url(mapa_url)
+            coords = extraer_coordenadas_desde_url(mapa_url) or resolver_url_por_http(mapa_url)
             if coords:
                 farmacia["coordenadas"] = coords
-                cache[direccion] = coords
+                store.set(direccion, coords, localidad)
                 cambios = True
 
     if cambios:
-        with open(FARMACIAS_24H_JSON, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        guardar_cache(cache)
+        escribir_salida(data, FARMACIAS_24H_JSON)
+        exportar_cache()
         print("[✓] Archivo actualizado con nuevas coordenadas.")
     else:
         print("[INFO] No había coordenadas por agregar.")
 
 
-def obtener_coordenadas_desde_url_directa(mapa_url, delay=3):
-    """Abre el link de Google Maps directamente y extrae coordenadas usando Selenium."""
+def obtener_coordenadas_desde_url_directa(mapa_url, timeout=10):
+    """Abre el link de Google Maps directamente y extrae coordenadas usando un WebDriver del pool."""
     print(f"[MAPA] Ingresando a: {mapa_url}")
-    driver = crear_driver()
-    try:
+    with get_driver_pool().driver() as driver:
         driver.get(mapa_url)
-        time.sleep(delay)
-        final_url = driver.current_url
-        coords = extraer_coordenadas_desde_url(final_url)
-        if coords:
-            print(f"[✓] Coordenadas: {coords}")
-            return coords
-        else:
-            print("[✗] No se encontraron coordenadas")
-            return {"lat": None, "lng": None}
-    finally:
-        driver.quit()
+        final_url = esperar_url_con_coordenadas(driver, timeout)
+    coords = extraer_coordenadas_desde_url(final_url)
+    if coords:
+        print(f"[✓] Coordenadas: {coords}")
+        return coords
+    else:
+        print("[✗] No se encontraron coordenadas")
+        return {"lat": None, "lng": None}
 
 
 if __name__ == "__main__":
@@ -7,7 +7,8 @@ import asyncio
 
 from logger_config import setup_logging
 from run_scrapers import run_all_scrapers
-from utils import send_telegram_notification
+from utils import send_telegram_notification, esperar_push
+import metrics
 
 def pull_latest_changes():
     """
@@ -60,7 +61,8 @@ def main():
     Punto de entrada principal: actualiza el repo y luego ejecuta los scrapers.
     """
     # 1. Actualizar el código desde el repositorio de GitHub
-    pull_latest_changes()
+    with metrics.etapa("git_pull", principal=True):
+        pull_latest_changes()
 
     # 2. Ejecutar el proceso de scraping y actualización de datos
     print("\n[INFO] Repositorio actualizado. Iniciando el proceso de scraping...")
@@ -92,6 +94,8 @@ if __name__ == "__main__":
 
     finally:
         # 5. Este bloque se ejecuta SIEMPRE, haya habido error o no
+        # El push corre en segundo plano: la duración total lo incluye
+        esperar_push()
         end_time = datetime.now()
         duration = end_time - start_time
         
@@ -111,6 +115,18 @@ if __name__ == "__main__":
 *Duración:* {duration_str}
 *Archivo de Log:* `{log_filename_escaped}`
 """
+        # Métricas por etapa: archivo JSON de la corrida y las cinco etapas más lentas en el resumen
+        metricas = metrics.get_metricas()
+        try:
+            metricas.guardar()
+        except OSError as e:
+            print(f"[ADVERTENCIA] No se pudieron guardar las métricas: {e}")
+        mas_lentas = metricas.mas_lentas(5)
+        if mas_lentas:
+            # Dentro de un bloque de código MarkdownV2 solo hay que escapar ` y \
+            filas = "\n".join(f"{segundos:8.1f}s  {nombre}" for nombre, segundos in mas_lentas)
+            filas = filas.replace("\\", "\\\\").replace("`", "\\`")
+            summary_message += f"\n*Etapas más lentas:*\n```\n{filas}\n```\n"
         if error_details:
             # Si hubo un error, añadir los detalles al mensaje
             summary_message += f"\n*Detalle del Error:*\n```\n{error_details[:3500]}\n```" # Telegram tiene un límite de 4096 caracteres
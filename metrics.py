@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from output_writer import codificar, escribir_atomico
+
+# Un JSON por corrida en METRICS_DIR (por defecto "metrics"); con METRICS_PROMETHEUS_PATH
+# también un textfile para el textfile collector de node_exporter. Se leen al guardar,
+# después de load_dotenv().
+
+
+class Metricas:
+    """
+    Tiempos por etapa y contadores de una corrida. Se puede usar desde varios
+    threads a la vez (los scrapers corren en paralelo).
+
+    - etapas: nombre -> {"segundos", "veces", "principal"}; una etapa que se
+      repite (por ejemplo cada búsqueda con Selenium) acumula el tiempo. Las
+      principales son los pasos de la corrida ("merge", "commit"...); el resto
+      son partes de alguna de ellas ("scraper[X].http", "staging") y su tiempo
+      ya está contado en la principal.
+    - contadores: nombre -> valor (bytes descargados, registros, aciertos del cache...).
+    """
+    def __init__(self):
+        self.inicio = datetime.now()
+        self.etapas = {}
+        self.contadores = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nombre, segundos, principal=False):
+        with self._lock:
+            etapa = self.etapas.setdefault(nombre, {"segundos": 0.0, "veces": 0, "principal": principal})
+            etapa["segundos"] += segundos
+            etapa["veces"] += 1
+
+    @contextmanager
+    def etapa(self, nombre, principal=False):
+        """
+        with metricas.etapa("merge", principal=True): ... mide cuánto tarda el
+        bloque, aunque falle.
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nombre, time.perf_counter() - inicio, principal)
+
+    def sumar(self, nombre, valor=1):
+        with self._lock:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + valor
+
+    def mas_lentas(self, n=5):
+        """
+        Devuelve las `n` etapas principales con más tiempo acumulado como
+        (nombre, segundos). Las anidadas no entran, porque contarían dos veces
+        el mismo tiempo.
+        """
+        with self._lock:
+            etapas = [(nombre, etapa["segundos"]) for nombre, etapa in self.etapas.items() if etapa["principal"]]
+        return sorted(etapas, key=lambda par: par[1], reverse=True)[:n]
+
+    def como_dict(self):
+        with self._lock:
+            return {
+                "inicio": self.inicio.isoformat(timespec="seconds"),
+                "duracion_segundos": round((datetime.now() - self.inicio).total_seconds(), 3),
+                "etapas": {nombre: {"segundos": round(etapa["segundos"], 4), "veces": etapa["veces"],
+                                    "principal": etapa["principal"]}
+                           for nombre, etapa in self.etapas.items()},
+                "contadores": dict(self.contadores),
+            }
+
+    def como_prometheus(self):
+        """
+        Formato de exposición de texto de Prometheus, con el nombre de la etapa
+        o del contador como label.
+        """
+        def label(texto):
+            return texto.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        datos = self.como_dict()
+        lineas = [
+            "# HELP chefarmacia_etapa_segundos Segundos acumulados por etapa en la última corrida.",
+            "# TYPE chefarmacia_etapa_segundos gauge",
+        ]
+        lineas += [f'chefarmacia_etapa_segundos{{etapa="{label(nombre)}"}} {etapa["segundos"]}'
+                   for nombre, etapa in sorted(datos["etapas"].items())]
+        lineas += [
+            "# HELP chefarmacia_contador Contadores de la última corrida.",
+            "# TYPE chefarmacia_contador gauge",
+        ]
+        lineas += [f'chefarmacia_contador{{nombre="{label(nombre)}"}} {valor}'
+                   for nombre, valor in sorted(datos["contadores"].items())]
+        lineas += [
+            "# HELP chefarmacia_duracion_segundos Duración total de la última corrida.",
+            "# TYPE chefarmacia_duracion_segundos gauge",
+            f"chefarmacia_duracion_segundos {datos['duracion_segundos']}",
+            "# HELP chefarmacia_ultima_corrida_timestamp Inicio de la última corrida (epoch).",
+            "# TYPE chefarmacia_ultima_corrida_timestamp gauge",
+            f"chefarmacia_ultima_corrida_timestamp {int(self.inicio.timestamp())}",
+        ]
+        return "\n".join(lineas) + "\n"
+
+    def guardar(self, directorio=None, prometheus_path=None):
+        """
+        Escribe metrics/{fecha}_{hora}.json (y el textfile de Prometheus si
+        está configurado). Devuelve el path del JSON.
+        """
+        directorio = directorio or os.getenv("METRICS_DIR", "metrics")
+        prometheus_path = prometheus_path or os.getenv("METRICS_PROMETHEUS_PATH")
+        path = os.path.join(directorio, f"{self.inicio.strftime('%Y-%m-%d_%H-%M-%S')}.json")
+        escribir_atomico(path, codificar(self.como_dict(), minificado=False))
+        if prometheus_path:
+            escribir_atomico(prometheus_path, self.como_prometheus().encode("utf-8"))
+        print(f"[INFO] Métricas de la corrida guardadas en {path}")
+        return path
+
+
+_metricas = Metricas()
+
+
+def get_metricas():
+    return _metricas
+
+
+def etapa(nombre, principal=False):
+    return _metricas.etapa(nombre, principal)
+
+
+def registrar(nombre, segundos, principal=False):
+    _metricas.registrar(nombre, segundos, principal)
+
+
+def sumar(nombre, valor=1):
+    _metricas.sumar(nombre, valor)
@@ -0,0 +1,141 @@
+import gzip
+import json
+import os
+import tempfile
+
+# Encoders opcionales, del más rápido al más lento. Si no hay ninguno se usa json de la stdlib.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODERS = ("orjson", "msgspec", "json")
+
+
+def escribir_atomico(path, contenido):
+    """
+    Escribe en un archivo temporal y lo renombra, para no dejar archivos a medio
+    escribir si el proceso se corta (o si dos threads escriben a la vez).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(contenido)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def encoder_disponible():
+    if orjson is not None:
+        return "orjson"
+    if msgspec is not None:
+        return "msgspec"
+    return "json"
+
+
+def ordenar_claves_habilitado():
+    return os.getenv("OUTPUT_ORDENAR_CLAVES", "1") != "0"
+
+
+def codificar(data, minificado=True, encoder=None, ordenar=None):
+    """
+    Devuelve `data` como JSON en bytes UTF-8 con el encoder más rápido
+    disponible. La versión legible (minificado=False) usa indent=2; solo con
+    la stdlib es idéntica byte a byte a json.dump(..., indent=2,
+    ensure_ascii=False), porque orjson puede formatear los floats distinto.
+
+    Con `ordenar` (por defecto, salvo OUTPUT_ORDENAR_CLAVES=0) las claves de
+    los objetos salen ordenadas, así los mismos datos dan siempre los mismos
+    bytes sin importar en qué orden se armaron los dicts.
+    """
+    encoder = encoder or encoder_disponible()
+    if ordenar is None:
+        ordenar = ordenar_claves_habilitado()
+    if encoder == "orjson" and orjson is not None:
+        opciones = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if ordenar else 0)
+        if not minificado:
+            opciones |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=opciones)
+    if not minificado:
+        # msgspec no tiene un modo indentado equivalente: se usa la stdlib
+        return json.dumps(data, indent=2, ensure_ascii=False, sort_keys=ordenar).encode("utf-8")
+    if encoder == "msgspec" and msgspec is not None:
+        return msgspec.json.encode(data, order="sorted" if ordenar else None)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=ordenar).encode("utf-8")
+
+
+def comprimir_gzip(contenido):
+    # mtime=0: la salida no depende de la hora, así un contenido igual da bytes iguales
+    return gzip.compress(contenido, compresslevel=9, mtime=0)
+
+
+def comprimir_brotli(contenido):
+    return brotli.compress(contenido, quality=11) if brotli is not None else None
+
+
+def variantes_habilitadas():
+    return os.getenv("OUTPUT_VARIANTES", "1") != "0"
+
+
+def path_minificado(path):
+    """
+    data/farmacias_turno.json -> data/farmacias_turno.min.json
+    """
+    base, extension = os.path.splitext(path)
+    return f"{base}.min{extension or '.json'}"
+
+
+def escribir_si_cambio(path, contenido):
+    """
+    Escribe `contenido` (bytes) en `path` solo si difiere de lo que ya hay.
+    Devuelve True si escribió.
+    """
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if f.read() == contenido:
+                return False
+    escribir_atomico(path, contenido)
+    return True
+
+
+def escribir_salida(data, path, variantes=None):
+    """
+    Escribe `data` en `path` con indent=2 (para los diffs) y, si las variantes
+    están habilitadas, la versión minificada en X.min.json junto con
+    X.min.json.gz y X.min.json.br, listas para que un hosting estático las
+    sirva con Content-Encoding. Solo se tocan los archivos cuyo contenido
+    cambió. Devuelve la lista de archivos escritos.
+    """
+    if variantes is None:
+        variantes = variantes_habilitadas()
+
+    escritos = []
+    if escribir_si_cambio(path, codificar(data, minificado=False)):
+        escritos.append(path)
+    if not variantes:
+        return escritos
+
+    minificado = codificar(data)
+    min_path = path_minificado(path)
+    salidas = [(min_path, minificado), (f"{min_path}.gz", comprimir_gzip(minificado))]
+    comprimido_br = comprimir_brotli(minificado)
+    if comprimido_br is not None:
+        salidas.append((f"{min_path}.br", comprimido_br))
+
+    for destino, contenido in salidas:
+        if escribir_si_cambio(destino, contenido):
+            escritos.append(destino)
+    return escritos
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import time
+
+from address_normalizer import slug
+from output_writer import codificar, escribir_atomico, escribir_si_cambio, path_minificado, variantes_habilitadas
+
+MANIFEST = "manifest.json"
+
+
+def respuesta_del_dia(localidad, mes, dia, contenido, farmacias):
+    """
+    Lo que necesita un cliente para mostrar los turnos de una localidad en un día.
+    """
+    return {
+        "localidad": localidad,
+        "mes": mes.lower(),
+        "dia": dia,
+        "fuente": contenido.get("fuente"),
+        "farmacias": farmacias,
+    }
+
+
+def slugs_de_localidades(data):
+    """
+    Asigna un slug a cada localidad de `data`. Si dos localidades se normalizan
+    igual, la segunda lleva un hash corto para no pisarse.
+    """
+    slugs = {}
+    usados = set()
+    for localidades in data.values():
+        for localidad in localidades:
+            if localidad in slugs:
+                continue
+            candidato = slug(localidad)
+            if candidato in usados:
+                candidato = f"{candidato}-{hashlib.sha256(localidad.encode('utf-8')).hexdigest()[:8]}"
+            usados.add(candidato)
+            slugs[localidad] = candidato
+    return slugs
+
+
+def archivos_api(data):
+    """
+    Arma los archivos de la API estática a partir de `data` (formato de
+    farmacias_turno.json). Devuelve un dict {path relativo: contenido}:
+
+    - {localidad}/{mes}/{dia}.json: las farmacias de turno de ese día.
+    - {localidad}/{mes}/index.json: los días del mes con su archivo y la
+      cantidad de farmacias.
+    - index.json: las localidades con su nombre y los meses disponibles.
+    """
+    slugs = slugs_de_localidades(data)
+    archivos = {}
+    indice = {}
+    for mes, localidades in data.items():
+        mes = mes.lower()
+        for localidad, contenido in localidades.items():
+            base = f"{slugs[localidad]}/{mes}"
+            dias = {}
+            for dia, farmacias in contenido.get("dias", {}).items():
+                try:
+                    numero = int(dia)
+                except ValueError:
+                    continue
+                archivos[f"{base}/{numero}.json"] = respuesta_del_dia(localidad, mes, numero, contenido, farmacias)
+                dias[str(numero)] = {"archivo": f"{numero}.json", "farmacias": len(farmacias)}
+            archivos[f"{base}/index.json"] = {
+                "localidad": localidad,
+                "mes": mes,
+                "fuente": contenido.get("fuente"),
+                "dias": dict(sorted(dias.items(), key=lambda par: int(par[0]))),
+            }
+            entrada = indice.setdefault(slugs[localidad], {"nombre": localidad, "meses": []})
+            if mes not in entrada["meses"]:
+                entrada["meses"].append(mes)
+    archivos["index.json"] = {"localidades": dict(sorted(indice.items()))}
+    return archivos
+
+
+def publicar_api(data, directorio=None):
+    """
+    Escribe la API estática en `directorio` (por defecto PUBLISH_API_DIR, leído
+    al llamarla: data/api/{localidad}/{mes}/{dia}.json), JSON minificado. Solo
+    se reescriben los archivos cuyo contenido cambió y se borran los que ya no
+    corresponden a ningún día. Devuelve la lista de archivos escritos o borrados.
+    """
+    directorio = directorio or os.getenv("PUBLISH_API_DIR", "data/api")
+    archivos = archivos_api(data)
+    cambiados = []
+    total_bytes = 0
+    for relativo, contenido in archivos.items():
+        cuerpo = codificar(contenido)
+        total_bytes += len(cuerpo)
+        path = os.path.join(directorio, *relativo.split("/"))
+        if escribir_si_cambio(path, cuerpo):
+            cambiados.append(path)
+
+    # Archivos de días o localidades que ya no están en los datos
+    esperados = {os.path.normpath(os.path.join(directorio, *relativo.split("/"))) for relativo in archivos}
+    for raiz, carpetas, nombres in os.walk(directorio, topdown=False):
+        for nombre in nombres:
+            path = os.path.normpath(os.path.join(raiz, nombre))
+            if nombre.endswith(".json") and path not in esperados:
+                os.remove(path)
+                cambiados.append(path)
+        if raiz != directorio and not os.listdir(raiz):
+            os.rmdir(raiz)
+
+    print(f"[INFO] API estática: {len(archivos)} archivos en {directorio} "
+          f"(promedio {total_bytes // max(len(archivos), 1)} bytes), {len(cambiados)} actualizados")
+    return cambiados
+
+
+def nombre_hasheado(logico, sha):
+    """
+    ("turnos/agosto/tigre.json", sha256) -> "turnos/agosto/tigre.3f2a9c0d1e4b5a69.json"
+    """
+    base, extension = os.path.splitext(logico)
+    return f"{base}.{sha[:16]}{extension}"
+
+
+def salidas_publicadas(data_dir="data", shards_dir=None):
+    """
+    Devuelve {nombre lógico: path} con los archivos de salida que se publican
+    con hash: farmacias_turno.json, farmacias_24_horas.json, localidades.json
+    y los shards por mes y localidad. Se prefiere la variante minificada
+    cuando está habilitada (OUTPUT_VARIANTES); si no, un .min.json que quedó
+    de antes estaría desactualizado.
+    """
+    variantes = variantes_habilitadas()
+    shards_dir = shards_dir or os.getenv("TURNOS_SHARDS_DIR", os.path.join(data_dir, "turnos"))
+    salidas = {}
+    for nombre in ("farmacias_turno.json", "farmacias_24_horas.json", "localidades.json"):
+        path = os.path.join(data_dir, nombre)
+        if variantes and os.path.exists(path_minificado(path)):
+            salidas[nombre] = path_minificado(path)
+        elif os.path.exists(path):
+            salidas[nombre] = path
+
+    manifest_shards = os.path.join(shards_dir, "manifest.json")
+    if os.path.exists(manifest_shards):
+        with open(manifest_shards, "r", encoding="utf-8") as f:
+            shards = json.load(f).get("shards", {})
+        for localidades in shards.values():
+            for info in localidades.values():
+                salidas[f"turnos/{info['archivo']}"] = os.path.join(shards_dir, *info["archivo"].split("/"))
+    return salidas
+
+
+def publicar_hasheados(salidas, directorio=None, retencion_dias=None):
+    """
+    Copia cada archivo de `salidas` ({nombre lógico: path}) a `directorio` con
+    el hash de su contenido en el nombre, y escribe un manifest.json que
+    relaciona cada nombre lógico con su copia. Las copias no cambian nunca,
+    así que los clientes y las CDN pueden guardarlas para siempre y solo
+    revalidar el manifest.
+
+    Las copias que ya no figuran en el manifest se borran cuando pasaron
+    `retencion_dias` desde la última vez que figuraron, para que un cliente con
+    un manifest viejo todavía las encuentre. Devuelve la lista de archivos
+    escritos o borrados.
+
+    Por defecto se usan PUBLISH_HASH_DIR y PUBLISH_RETENCION_DIAS, que se leen
+    al llamarla (después de load_dotenv()).
+    """
+    directorio = directorio or os.getenv("PUBLISH_HASH_DIR", "data/hashed")
+    if retencion_dias is None:
+        retencion_dias = float(os.getenv("PUBLISH_RETENCION_DIAS", "7"))
+    cambiados = []
+    archivos = {}
+    vigentes = set()
+    ahora = time.time()
+    for logico, path in sorted(salidas.items()):
+        with open(path, "rb") as f:
+            contenido = f.read()
+        sha = hashlib.sha256(contenido).hexdigest()
+        hasheado = nombre_hasheado(logico, sha)
+        destino = os.path.join(directorio, *hasheado.split("/"))
+        if not os.path.exists(destino):
+            escribir_atomico(destino, contenido)
+            cambiados.append(destino)
+        else:
+            # La fecha de modificación marca la última vez que figuró en el manifest
+            os.utime(destino, (ahora, ahora))
+        vigentes.add(os.path.normpath(destino))
+        archivos[logico] = {
+            "archivo": hasheado,
+            "sha256": sha,
+            "bytes": len(contenido),
+        }
+
+    manifest_path = os.path.join(directorio, MANIFEST)
+    if escribir_si_cambio(manifest_path, codificar({"version": 1, "archivos": archivos})):
+        cambiados.append(manifest_path)
+    vigentes.add(os.path.normpath(manifest_path))
+
+    limite = ahora - retencion_dias * 86400
+    borrados = 0
+    for raiz, carpetas, nombres in os.walk(directorio, topdown=False):
+        for nombre in nombres:
+            path = os.path.normpath(os.path.join(raiz, nombre))
+            if path not in vigentes and os.path.getmtime(path) < limite:
+                os.remove(path)
+                cambiados.append(path)
+                borrados += 1
+        if raiz != directorio and not os.listdir(raiz):
+            os.rmdir(raiz)
+
+    print(f"[INFO] Copias con hash: {len(archivos)} en el manifest, "
+          f"{len(cambiados) - borrados} archivos nuevos o actualizados, {borrados} vencidos borrados")
+    return cambiados
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python publish.py api|hash [farmacias_turno.json]
+    accion = sys.argv[1] if len(sys.argv) > 1 else "api"
+    json_path = sys.argv[2] if len(sys.argv) > 2 else "data/farmacias_turno.json"
+    if accion == "hash":
+        publicar_hasheados(salidas_publicadas(os.path.dirname(json_path)))
+    else:
+        with open(json_path, "r", encoding="utf-8") as f:
+            publicar_api(json.load(f))
@@ -1,4 +1,8 @@
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 from tqdm import tqdm
 
@@ -8,24 +12,70 @@ from scrapers.la_plata import LaPlataScraper
 from scrapers.merlo import MerloScraper
 from scrapers.zarate import ZarateScraper
 from scrapers.florencio_varela import VarelaScraper
-from scrapers.quilmes import QuilmesScraper
-from scrapers.berazategui import BerazateguiScraper
-from scrapers.lincoln import LincolnScraper
-from scrapers.azul import AzulScraper
-from scrapers.bolivar import BolivarScraper
-from scrapers.coronel_suarez import CoronelSuarezScraper
-from scrapers.las_toninas import LasToninasScraper
-from scrapers.mar_de_ajo import MarDeAjoScraper
-from scrapers.mar_del_tuyu import MarDelTuyuScraper
-from scrapers.miramar import MiramarScraper
-from scrapers.san_bernardo import SanBernardoScraper
-from scrapers.san_clemente_del_tuyu import SanClementeScraper
-from scrapers.santa_teresita import SantaTeresitaScraper
+from scrapers import farmaciadeturnoahora
 from scrapers.sources import SourcesScraper
 from scrapers.san_fernando import SanFernandoScraper
 from scrapers.mar_del_plata import MarDelPlataScraper
 
-from utils import save_to_json, commit_and_push, format_data_for_json, merge_data, generate_localities_list
+from get_coords_from_maps import exportar_cache
+from utils import save_to_json, commit_and_push, format_data_for_json, generate_localities_list, adjuntar_coordenadas
+from turno_store import TurnoStore
+import metrics
+import publish
+
+def host_del_scraper(scraper):
+    """
+    Devuelve el host al que consulta el scraper, o None si no accede a la web
+    (por ejemplo SourcesScraper).
+    """
+    url = getattr(scraper, 'URL', None)
+    return urlparse(url).netloc if url else None
+
+
+def ejecutar_scraper(scraper):
+    """
+    Ejecuta un scraper y devuelve una tupla (datos, duración en segundos).
+    """
+    # El mensaje de info ahora es más genérico para el SourcesScraper
+    localidad_info = getattr(scraper, 'LOCALIDAD', scraper.__class__.__name__)
+    print(f"\n[INFO] Ejecutando scraper para: {localidad_info}")
+    inicio = time.perf_counter()
+    datos = scraper.run()
+    duracion = time.perf_counter() - inicio
+    metrics.registrar(f"{scraper.nombre_metricas}.total", duracion)
+    metrics.sumar(f"{scraper.nombre_metricas}.registros", len(datos or []))
+    return datos, duracion
+
+
+def ejecutar_concurrente(scrapers, max_workers, max_por_host):
+    """
+    Ejecuta los scrapers en un pool de threads, limitando a `max_por_host` las
+    consultas simultáneas a un mismo host (una docena de scrapers le pegan a
+    www.farmaciadeturnoahora.com.ar).
+
+    Devuelve los resultados en el mismo orden que la lista de scrapers.
+    """
+    semaforos = {}
+    for scraper in scrapers:
+        host = host_del_scraper(scraper)
+        if host and host not in semaforos:
+            semaforos[host] = threading.BoundedSemaphore(max_por_host)
+
+    def tarea(scraper):
+        semaforo = semaforos.get(host_del_scraper(scraper))
+        if semaforo is None:
+            return ejecutar_scraper(scraper)
+        with semaforo:
+            return ejecutar_scraper(scraper)
+
+    resultados = [None] * len(scrapers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futuros = {executor.submit(tarea, scraper): i for i, scraper in enumerate(scrapers)}
+        for futuro in tqdm(as_completed(futuros), total=len(futuros), desc="Ejecutando scrapers"):
+            resultados[futuros[futuro]] = futuro.result()
+
+    return resultados
+
 
 def run_all_scrapers():
     load_dotenv()
@@ -39,53 +89,77 @@ def run_all_scrapers():
         LaPlataScraper(),
         MerloScraper(),
         ZarateScraper(),
-        QuilmesScraper(),
-        BerazateguiScraper(),
-        LincolnScraper(),
-        AzulScraper(),
-        BolivarScraper(),
-        CoronelSuarezScraper(),
-        LasToninasScraper(),
-        MarDeAjoScraper(),
-        MarDelTuyuScraper(),
-        MiramarScraper(),
-        SanBernardoScraper(),
-        SanClementeScraper(),
-        SantaTeresitaScraper(),
+        # Una instancia por fila de farmaciadeturnoahora.LOCALIDADES
+        *farmaciadeturnoahora.crear_scrapers(),
         SanFernandoScraper(),
         MarDelPlataScraper(),
 
         VarelaScraper(),
     ]
 
-    datos_combinados = {}
+    # SCRAPERS_WORKERS=1 vuelve a la ejecución secuencial original
+    max_workers = int(os.getenv("SCRAPERS_WORKERS", "8"))
+    max_por_host = int(os.getenv("SCRAPERS_MAX_POR_HOST", "2"))
+
+    inicio = time.perf_counter()
+    if max_workers > 1:
+        resultados = ejecutar_concurrente(scrapers, max_workers, max_por_host)
+    else:
+        resultados = [ejecutar_scraper(scraper) for scraper in tqdm(scrapers, desc="Ejecutando scrapers")]
+    duracion_total = time.perf_counter() - inicio
+    metrics.registrar("scrapers", duracion_total, principal=True)
+
+    # La suma de las duraciones individuales es lo que hubiera tardado la corrida secuencial
+    duracion_secuencial = sum(duracion for _, duracion in resultados)
+    print(f"\n[INFO] Scrapers finalizados en {duracion_total:.1f}s "
+          f"(secuencial estimado: {duracion_secuencial:.1f}s, "
+          f"aceleración: {duracion_secuencial / max(duracion_total, 1e-6):.1f}x)")
+
+    # El merge se hace en el orden de la lista de scrapers, no en el de finalización,
+    # para que el resultado sea siempre el mismo. El TurnoStore mantiene un solo
+    # índice para toda la corrida y resuelve los choques por nivel de confianza.
+    with metrics.etapa("merge", principal=True):
+        store = TurnoStore()
+        for datos, _ in resultados:
+            store.merge(format_data_for_json(datos, geocodificar=False))
+        datos_combinados = store.data
 
-    for scraper in tqdm(scrapers, desc="Ejecutando scrapers"):
-        # El mensaje de info ahora es más genérico para el SourcesScraper
-        localidad_info = getattr(scraper, 'LOCALIDAD', scraper.__class__.__name__)
-        print(f"\n[INFO] Ejecutando scraper para: {localidad_info}")
-        datos = scraper.fetch()
-        datos_formateados = format_data_for_json(datos)
-        datos_combinados = merge_data(datos_combinados, datos_formateados)
+    # Geocodificación en lote: una búsqueda por dirección única de toda la corrida
+    inicio = time.perf_counter()
+    with metrics.etapa("geocodificacion", principal=True):
+        adjuntar_coordenadas(datos_combinados)
+    print(f"[INFO] Geocodificación finalizada en {time.perf_counter() - inicio:.1f}s")
 
 
+    # Mantener coordenadas_cache.json al día para quien todavía lo lea.
+    # `escritos` junta los archivos que toca la corrida: son los únicos que se suben.
+    with metrics.etapa("exportar_cache", principal=True):
+        escritos = exportar_cache()
+
     # Guardar toda la info unificada
     MAIN_JSON_FILENAME = "data/farmacias_turno.json"
-    save_to_json(datos_combinados)
+    with metrics.etapa("save_to_json", principal=True):
+        escritos.extend(save_to_json(datos_combinados))
 
     # Generar el archivo de localidades a partir del archivo principal recién guardado
     LOCALITIES_FILENAME = "data/localidades.json"
-    generate_localities_list(input_json_path=MAIN_JSON_FILENAME, output_json_path=LOCALITIES_FILENAME)
+    with metrics.etapa("localidades", principal=True):
+        escritos.extend(generate_localities_list(input_json_path=MAIN_JSON_FILENAME, output_json_path=LOCALITIES_FILENAME))
+
+    # Copias con hash de las salidas y su manifest, para que los clientes las guarden para siempre
+    with metrics.etapa("publicar_hasheados", principal=True):
+        escritos.extend(publish.publicar_hasheados(publish.salidas_publicadas(os.path.dirname(MAIN_JSON_FILENAME))))
+    metrics.sumar("archivos_escritos", len(escritos))
 
     # Hacer commit y push
     repo_path = os.getenv("GITHUB_REPO_PATH")
-    # Un mensaje más genérico ya que estamos subiendo todos los cambios del proyecto
     commit_message = "Actualización automática de datos y archivos del proyecto"
 
     if repo_path:
-        # Simplemente llamamos a la función con la ruta y el mensaje.
-        # Ya no necesitamos construir una lista de archivos.
-        commit_and_push(repo_path, commit_message)
+        # Solo se agregan al commit los archivos de salida de esta corrida (no logs/ ni el resto
+        # del árbol). El push sigue en segundo plano; main.py espera a que termine.
+        with metrics.etapa("commit", principal=True):
+            commit_and_push(repo_path, commit_message, archivos=escritos)
     else:
         print("[ADVERTENCIA] No se realizará commit y push. Falta la variable de entorno GITHUB_REPO_PATH.")
 
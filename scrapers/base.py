@@ -1,6 +1,139 @@
 from abc import ABC, abstractmethod
+import time as reloj
+from datetime import datetime, time, timedelta
+
+import metrics
+from coordenadas import adjuntar_coordenadas_a_registros
+
+from . import http_cache, turno_cache
+from .http_client import get_session
+from .parsing import parsear_html
 
 class BaseScraper(ABC):
+    # Hora a la que cambia el turno farmacéutico (8:30 AM)
+    HORA_CORTE = (8, 30)
+
+    # Si es True, el resultado se reutiliza entre corridas hasta el próximo cambio de turno
+    CACHE_POR_TURNO = False
+
+    # Parte de la página que usa el scraper (parsing.Fragmento). None = página completa
+    FRAGMENTO = None
+
+    @property
+    def http(self):
+        """
+        Cliente HTTP compartido (keep-alive, compresión, timeouts y reintentos).
+        """
+        return get_session()
+
+    @property
+    def nombre_metricas(self):
+        """
+        Nombre con el que el scraper aparece en las métricas: "scraper[San Isidro]".
+        """
+        return f"scraper[{getattr(self, 'LOCALIDAD', None) or self.__class__.__name__}]"
+
+    def _medir_descarga(self, inicio, response):
+        metrics.registrar(f"{self.nombre_metricas}.http", reloj.perf_counter() - inicio)
+        if getattr(response, "desde_cache", False):
+            # 304: el cuerpo salió del cache en disco, no se descargó
+            metrics.sumar(f"{self.nombre_metricas}.http_304")
+        else:
+            metrics.sumar(f"{self.nombre_metricas}.bytes", len(response.content or b""))
+
+    def get(self, url=None, **kwargs):
+        """
+        Hace un GET con el cliente compartido. Por defecto consulta self.URL.
+        """
+        inicio = reloj.perf_counter()
+        response = self.http.get(url or self.URL, **kwargs)
+        self._medir_descarga(inicio, response)
+        return response
+
+    def parse_html(self, markup, backend=None):
+        """
+        Parsea `markup` construyendo solo el FRAGMENTO que declara el scraper.
+        """
+        with metrics.etapa(f"{self.nombre_metricas}.parse"):
+            return parsear_html(markup, self.FRAGMENTO, backend)
+
+    def get_cacheado(self, url=None, **kwargs):
+        """
+        Igual que get(), pero con un GET condicional contra el cache en disco.
+        La respuesta trae `sin_cambios=True` si el contenido es el de la corrida anterior.
+        """
+        inicio = reloj.perf_counter()
+        response = http_cache.get_condicional(self.http, url or self.URL, **kwargs)
+        self._medir_descarga(inicio, response)
+        return response
+
+    def parsear_cacheado(self, response, parser):
+        """
+        Aplica `parser(response)` salvo que el contenido no haya cambiado desde la
+        corrida anterior, en cuyo caso devuelve los registros que se parsearon entonces.
+        """
+        url = getattr(response, "url_cache", response.url)
+        if getattr(response, "sin_cambios", False):
+            registros = http_cache.registros_previos(url, response.sha256)
+            if registros is not None:
+                print(f"[CACHE HTTP] Sin cambios, se reutilizan {len(registros)} registros de: {url}")
+                return registros
+
+        registros = parser(response)
+        if hasattr(response, "sha256") and http_cache.cache_habilitado():
+            http_cache.guardar_registros(url, response.sha256, registros)
+        return registros
+
+    def fecha_turno(self, ahora=None):
+        """
+        Devuelve la fecha (date) del turno vigente: antes de la hora de corte
+        el turno corresponde al día anterior.
+        """
+        ahora = ahora or datetime.now()
+        hora, minuto = self.HORA_CORTE
+        hora_corte = ahora.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+        if ahora < hora_corte:
+            return (ahora - timedelta(days=1)).date()
+        return ahora.date()
+
+    def fin_turno(self, fecha_turno):
+        """
+        Devuelve el datetime en que termina el turno de `fecha_turno`.
+        """
+        hora, minuto = self.HORA_CORTE
+        return datetime.combine(fecha_turno + timedelta(days=1), time(hora, minuto))
+
+    def clave_cache(self):
+        return f"{self.__class__.__name__}-{getattr(self, 'URL', '')}"
+
+    def fetch_con_coordenadas(self):
+        """
+        Ejecuta fetch() y agrega "coordenadas" a los registros cuyo link de mapa
+        ya las trae, para que no pasen por el geocodificador.
+        """
+        return adjuntar_coordenadas_a_registros(self.fetch())
+
+    def run(self) -> list[dict]:
+        """
+        Ejecuta fetch(). Si el scraper tiene CACHE_POR_TURNO, reutiliza el
+        resultado guardado mientras no cambie el turno.
+        """
+        if not (self.CACHE_POR_TURNO and turno_cache.cache_habilitado()):
+            return self.fetch_con_coordenadas()
+
+        clave = self.clave_cache()
+        fecha = self.fecha_turno()
+        registros = turno_cache.leer(clave, fecha)
+        if registros is not None:
+            print(f"[CACHE TURNO] Se reutilizan {len(registros)} registros del turno {fecha} para: {clave}")
+            return registros
+
+        registros = self.fetch_con_coordenadas()
+        # Un resultado vacío suele ser un error de la fuente: no lo fijamos por todo el turno
+        if registros:
+            turno_cache.guardar(clave, fecha, self.fin_turno(fecha), registros)
+        return registros
+
     @abstractmethod
     def fetch(self) -> list[dict]:
         """
@@ -12,5 +145,6 @@ class BaseScraper(ABC):
         - localidad
         - fuente
         - nivel_confianza (1-3)
+        - coordenadas (opcional): {"lat", "lng"} si la fuente las trae
         """
         pass
\ No newline at end of file
@@ -0,0 +1,216 @@
+# --- START OF FILE scrapers/farmaciadeturnoahora.py ---
+
+import os
+import re
+import unicodedata
+from collections import defaultdict
+
+import requests
+import soupsieve
+
+from coordenadas import extraer_coordenadas
+
+from .base import BaseScraper
+from .parsing import Fragmento
+
+BASE_URL = "https://www.farmaciadeturnoahora.com.ar"
+
+# Tabla de localidades que se obtienen de farmaciadeturnoahora.com.ar:
+# (ruta, localidad, nivel de confianza del 1 al 3).
+# Sumar una ciudad nueva es agregar una fila acá.
+LOCALIDADES = [
+    ("de-turno/buenos-aires/quilmes", "Quilmes", 3),
+    ("de-turno/buenos-aires/berazategui/", "Berazategui", 3),
+    ("directorio-de-farmacias/buenos-aires/lincoln/lincoln", "Lincoln", 1),
+    ("directorio-de-farmacias/buenos-aires/azul/azul", "Azul", 1),
+    ("directorio-de-farmacias/buenos-aires/bolivar/san-carlos-de-bolivar", "Bolivar", 1),
+    ("directorio-de-farmacias/buenos-aires/coronel-suarez/coronel-suarez", "Coronel Suarez", 1),
+    ("directorio-de-farmacias/buenos-aires/la-costa/las-toninas", "Las Toninas", 1),
+    ("directorio-de-farmacias/buenos-aires/la-costa/mar-de-ajo", "Mar de Ajo", 1),
+    ("directorio-de-farmacias/buenos-aires/la-costa/mar-del-tuyu", "Mar del Tuyu", 1),
+    ("directorio-de-farmacias/buenos-aires/general-alvarado/miramar", "Miramar", 1),
+    ("directorio-de-farmacias/buenos-aires/la-costa/san-bernardo", "San Bernardo", 1),
+    ("directorio-de-farmacias/buenos-aires/la-costa/san-clemente-del-tuyu", "San Clemente del Tuyu", 1),
+    ("directorio-de-farmacias/buenos-aires/la-costa/santa-teresita", "Santa Teresita", 1),
+]
+
+# Selectores y regex compilados una sola vez para todas las páginas.
+# Armar el árbol completo es la mayor parte del costo: solo construimos los bloques de farmacias.
+BLOQUES = Fragmento("div", "farmacia-de-turno")
+SEL_BLOQUE = soupsieve.compile("div.farmacia-de-turno")
+SEL_TELEFONO = soupsieve.compile("a[href^='tel:']")
+SEL_APPLE_MAPS = soupsieve.compile("a[href*='maps.apple.com']")
+SEL_LINK_DIRECTORIO = soupsieve.compile("a[href*='/directorio-de-farmacias/']")
+
+RE_TELEFONO = re.compile(r"[^\d+]")
+# /directorio-de-farmacias/buenos-aires/{partido}/{ciudad}[/...]
+RE_RUTA_DIRECTORIO = re.compile(r"directorio-de-farmacias/buenos-aires/([^/?#]+)/([^/?#]+)")
+
+
+class FarmaciaDeTurnoAhoraScraper(BaseScraper):
+    """
+    Scraper genérico para las páginas de farmaciadeturnoahora.com.ar. Cada
+    instancia corresponde a una fila de LOCALIDADES.
+    """
+    CACHE_POR_TURNO = True
+    FRAGMENTO = BLOQUES
+
+    def __init__(self, ruta, localidad, confianza):
+        self.URL = f"{BASE_URL}/{ruta}"
+        self.LOCALIDAD = localidad
+        self.CONFIANZA = confianza
+
+    def get_fecha_turno(self):
+        return self.fecha_turno().strftime("%d")
+
+    def fetch(self):
+        response = self.get(self.URL)
+        farmacias = self.parse(response.text)
+        print(f"Scraping finalizado. Farmacias encontradas: {len(farmacias)}")
+        return farmacias
+
+    def parse(self, html):
+        soup = self.parse_html(html)
+        fecha_turno = self.get_fecha_turno()
+        return [self.parse_bloque(bloque, fecha_turno) for bloque in SEL_BLOQUE.select(soup)]
+
+    def parse_bloque(self, bloque, fecha_turno):
+        nombre = bloque.find("h3", class_="titulo-farmacia-de-turno").text.strip()
+
+        direccion_tag = bloque.find("span", class_="direccion-farmacia-de-turno")
+        direccion = direccion_tag.text.strip() if direccion_tag else "Dirección no disponible"
+
+        telefono_tag = SEL_TELEFONO.select_one(bloque)
+        telefono = RE_TELEFONO.sub("", telefono_tag.text) if telefono_tag else "No disponible"
+
+        mapa_link_tag = SEL_APPLE_MAPS.select_one(bloque)
+        coords = extraer_coordenadas(mapa_link_tag.get("href", "")) if mapa_link_tag else None
+        if coords:
+            maps_link = f"https://www.google.com/maps/search/?api=1&query={coords['lat']},{coords['lng']}"
+        else:
+            maps_link = f"https://www.google.com/maps/search/{direccion}+{self.LOCALIDAD}"
+
+        farmacia = {
+            "fecha": fecha_turno,
+            "nombre": nombre,
+            "direccion": direccion,
+            "telefono": telefono,
+            "localidad": self.LOCALIDAD,
+            "fuente": self.URL,
+            "nivel_confianza": self.CONFIANZA,
+            "mapa": maps_link
+        }
+        if coords:
+            farmacia["coordenadas"] = coords
+        return farmacia
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+class FarmaciaDeTurnoAhoraPartidoScraper(BaseScraper):
+    """
+    Descarga una sola vez el listado de turno de un partido
+    (/de-turno/buenos-aires/{partido}) y reparte los bloques entre las ciudades
+    de LOCALIDADES que pertenecen a ese partido. Las ciudades que no aparecen en
+    el listado se consultan con su página individual.
+    """
+    CACHE_POR_TURNO = True
+    FRAGMENTO = BLOQUES
+
+    def __init__(self, partido, ciudades):
+        # ciudades: {slug de la ciudad: FarmaciaDeTurnoAhoraScraper}
+        self.URL = f"{BASE_URL}/de-turno/buenos-aires/{partido}"
+        self.PARTIDO = partido
+        self.ciudades = ciudades
+        self.LOCALIDAD = ", ".join(scraper.LOCALIDAD for scraper in ciudades.values())
+
+    def get_fecha_turno(self):
+        return self.fecha_turno().strftime("%d")
+
+    def ciudad_del_bloque(self, bloque):
+        """
+        Devuelve el slug de la ciudad a la que pertenece un bloque: primero por
+        el link al directorio, y si no lo tiene, por el nombre de la localidad en el texto.
+        """
+        for link in SEL_LINK_DIRECTORIO.select(bloque):
+            match = RE_RUTA_DIRECTORIO.search(link.get("href", ""))
+            if match and match.group(1) == self.PARTIDO and match.group(2) in self.ciudades:
+                return match.group(2)
+
+        texto = _normalizar(bloque.get_text(" "))
+        for slug, scraper in self.ciudades.items():
+            if _normalizar(scraper.LOCALIDAD) in texto:
+                return slug
+        return None
+
+    def fetch(self):
+        farmacias_por_ciudad = defaultdict(list)
+        try:
+            response = self.get(self.URL)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"[ADVERTENCIA] No se pudo obtener el listado de {self.PARTIDO}: {e}")
+        else:
+            soup = self.parse_html(response.text)
+            fecha_turno = self.get_fecha_turno()
+            for bloque in SEL_BLOQUE.select(soup):
+                slug = self.ciudad_del_bloque(bloque)
+                if slug is None:
+                    continue
+                farmacia = self.ciudades[slug].parse_bloque(bloque, fecha_turno)
+                farmacia["fuente"] = self.URL
+                farmacias_por_ciudad[slug].append(farmacia)
+
+        farmacias = []
+        for slug, scraper in self.ciudades.items():
+            if farmacias_por_ciudad[slug]:
+                farmacias.extend(farmacias_por_ciudad[slug])
+            else:
+                print(f"[INFO] {scraper.LOCALIDAD} no figura en el listado de {self.PARTIDO}, se usa su página individual.")
+                farmacias.extend(scraper.fetch())
+
+        print(f"Scraping de {self.PARTIDO} finalizado. Farmacias encontradas: {len(farmacias)}")
+        return farmacias
+
+
+def bulk_habilitado():
+    return os.getenv("FARMACIADETURNOAHORA_BULK", "1") != "0"
+
+
+def crear_scrapers(bulk=None):
+    """
+    Crea los scrapers para las filas de LOCALIDADES, en el mismo orden.
+
+    En modo bulk, las ciudades del directorio que comparten partido se agrupan
+    en un solo FarmaciaDeTurnoAhoraPartidoScraper (una petición por partido en
+    lugar de una por ciudad).
+    """
+    if bulk is None:
+        bulk = bulk_habilitado()
+
+    scrapers = [FarmaciaDeTurnoAhoraScraper(ruta, localidad, confianza) for ruta, localidad, confianza in LOCALIDADES]
+    if not bulk:
+        return scrapers
+
+    por_partido = defaultdict(dict)
+    for scraper in scrapers:
+        match = RE_RUTA_DIRECTORIO.search(scraper.URL)
+        if match:
+            partido, ciudad = match.groups()
+            por_partido[partido][ciudad] = scraper
+
+    resultado = []
+    agrupados = set()
+    for scraper in scrapers:
+        match = RE_RUTA_DIRECTORIO.search(scraper.URL)
+        partido = match.group(1) if match else None
+        # Un partido con una sola ciudad no ahorra peticiones: se deja la página individual
+        if partido is None or len(por_partido[partido]) < 2:
+            resultado.append(scraper)
+        elif partido not in agrupados:
+            agrupados.add(partido)
+            resultado.append(FarmaciaDeTurnoAhoraPartidoScraper(partido, por_partido[partido]))
+    return resultado
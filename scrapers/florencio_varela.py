@@ -1,35 +1,24 @@
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 from .base import BaseScraper
+from .parsing import Fragmento
 from urllib.parse import quote_plus
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
 class VarelaScraper(BaseScraper):
     URL = "https://www.varela.gov.ar/farmaciasdeturno/"
     LOCALIDAD = "Florencio Varela"
     CONFIANZA = 3  # Nivel de confianza del 1 al 3
+    FRAGMENTO = Fragmento("div", "card")
 
     def fetch(self):
-        session = requests.Session()
-        retries = Retry(
-            total=5,              # reintenta hasta 5 veces
-            backoff_factor=1,     # espera exponencial: 1s, 2s, 4s, etc.
-            status_forcelist=[502, 503, 504],
-            allowed_methods=["GET"]
-        )
-        adapter = HTTPAdapter(max_retries=retries)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-
+        # Los reintentos con backoff los aplica el cliente HTTP compartido
         try:
-            response = session.get(self.URL, timeout=15)  # timeout de 15 segundos
+            response = self.get(self.URL, timeout=15)  # timeout de 15 segundos
         except requests.exceptions.RequestException as e:
             print(f"Error al acceder a {self.URL}: {e}")
             return []
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = self.parse_html(response.text)
         cards = soup.select("div.card")
         farmacias = []
 
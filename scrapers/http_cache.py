@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+
+import requests
+
+from output_writer import escribir_atomico
+
+def directorio_cache():
+    # Donde se guardan las respuestas cacheadas (uno .json + uno .body por URL);
+    # se lee al usarse, después de load_dotenv()
+    return os.getenv("SCRAPERS_HTTP_CACHE_DIR", "cache/http")
+
+
+def cache_habilitado():
+    return os.getenv("SCRAPERS_HTTP_CACHE", "1") != "0"
+
+
+def _rutas(url):
+    clave = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    base = os.path.join(directorio_cache(), clave)
+    return base + ".json", base + ".body"
+
+
+def _leer_meta(url):
+    meta_path, _ = _rutas(url)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _guardar_meta(url, meta):
+    meta_path, _ = _rutas(url)
+    escribir_atomico(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+
+def _respuesta_desde_cache(url, meta):
+    """
+    Reconstruye un requests.Response a partir del cuerpo guardado, para que los
+    scrapers puedan usarlo igual que una respuesta 200.
+    """
+    _, body_path = _rutas(url)
+    with open(body_path, "rb") as f:
+        body = f.read()
+
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.url = url
+    response.encoding = meta.get("encoding")
+    response.headers.update(meta.get("headers", {}))
+    return response
+
+
+def get_condicional(session, url, **kwargs):
+    """
+    Hace un GET condicional (If-None-Match / If-Modified-Since) usando lo
+    guardado de la corrida anterior.
+
+    La respuesta devuelta tiene tres atributos extra (y `desde_cache=True`
+    si el cuerpo salió del disco por un 304):
+    - url_cache: la URL pedida, que es la clave del cache
+    - sha256: hash del cuerpo
+    - sin_cambios: True si el servidor respondió 304 o el cuerpo es idéntico al anterior
+    """
+    if not cache_habilitado():
+        response = session.get(url, **kwargs)
+        response.sha256 = hashlib.sha256(response.content).hexdigest()
+        response.url_cache = url
+        response.sin_cambios = False
+        return response
+
+    meta = _leer_meta(url)
+    headers_originales = kwargs.pop("headers", None) or {}
+    headers = dict(headers_originales)
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = session.get(url, headers=headers, **kwargs)
+
+    if response.status_code == 304 and meta:
+        try:
+            cached = _respuesta_desde_cache(url, meta)
+        except FileNotFoundError:
+            # Se borró el cuerpo pero no la metadata: pedimos de nuevo sin condiciones
+            _invalidar(url)
+            return get_condicional(session, url, headers=headers_originales, **kwargs)
+        cached.url_cache = url
+        cached.sha256 = meta["sha256"]
+        cached.sin_cambios = True
+        cached.desde_cache = True
+        print(f"[CACHE HTTP] 304 Not Modified: {url}")
+        return cached
+
+    response.url_cache = url
+    response.sha256 = hashlib.sha256(response.content).hexdigest()
+    response.sin_cambios = bool(meta) and meta.get("sha256") == response.sha256
+
+    if response.status_code == 200:
+        nueva_meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "encoding": response.encoding,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+            "sha256": response.sha256,
+        }
+        # Conservamos los registros parseados si el contenido no cambió
+        if response.sin_cambios and "registros" in meta:
+            nueva_meta["registros"] = meta["registros"]
+
+        _, body_path = _rutas(url)
+        if not response.sin_cambios or not os.path.exists(body_path):
+            escribir_atomico(body_path, response.content)
+        _guardar_meta(url, nueva_meta)
+
+    return response
+
+
+def _invalidar(url):
+    meta_path, _ = _rutas(url)
+    try:
+        os.remove(meta_path)
+    except FileNotFoundError:
+        pass
+
+
+def registros_previos(url, sha256):
+    """
+    Devuelve los registros parseados en una corrida anterior para este mismo
+    contenido, o None si no hay.
+    """
+    meta = _leer_meta(url)
+    if meta and meta.get("sha256") == sha256:
+        return meta.get("registros")
+    return None
+
+
+def guardar_registros(url, sha256, registros):
+    meta = _leer_meta(url)
+    if not meta or meta.get("sha256") != sha256:
+        return
+    meta["registros"] = registros
+    _guardar_meta(url, meta)
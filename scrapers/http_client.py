@@ -0,0 +1,72 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Timeouts por defecto (conexión, lectura) en segundos
+TIMEOUT_CONEXION = 10
+TIMEOUT_LECTURA = 30
+
+# Tamaño del pool de conexiones keep-alive por host
+CONEXIONES_POR_HOST = 10
+
+# brotli es opcional: solo lo anunciamos si urllib3 puede decodificarlo
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter que aplica un timeout por defecto a todas las peticiones
+    que no especifiquen uno propio.
+    """
+    def __init__(self, *args, timeout=(TIMEOUT_CONEXION, TIMEOUT_LECTURA), **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def crear_session():
+    """
+    Crea una Session con pool de conexiones por host, compresión y la política
+    de reintentos que antes estaba solo en VarelaScraper.
+    """
+    session = requests.Session()
+    retries = Retry(
+        total=5,              # reintenta hasta 5 veces
+        backoff_factor=1,     # espera exponencial: 1s, 2s, 4s, etc.
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["GET", "HEAD"]
+    )
+    adapter = TimeoutHTTPAdapter(
+        max_retries=retries,
+        pool_connections=CONEXIONES_POR_HOST,
+        pool_maxsize=CONEXIONES_POR_HOST,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    return session
+
+
+def get_session():
+    """
+    Devuelve la Session compartida por todos los scrapers, creándola la primera vez.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = crear_session()
+    return _session
@@ -1,17 +1,17 @@
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
 from .base import BaseScraper
+from .parsing import Fragmento
 import re
 
 class LaPlataScraper(BaseScraper):
     URL = "https://www.colfarmalp.org.ar/turnos-la-plata/"
     LOCALIDAD = "La Plata"
     CONFIANZA = 3  # Nivel de confianza del 1 al 3
+    CACHE_POR_TURNO = True
+    FRAGMENTO = Fragmento("div", "td")
 
     def fetch(self):
-        response = requests.get(self.URL)
-        soup = BeautifulSoup(response.text, "html.parser")
+        response = self.get(self.URL)
+        soup = self.parse_html(response.text)
         bloques = soup.select("div.td")
 
         farmacias = []
@@ -28,11 +28,7 @@ class LaPlataScraper(BaseScraper):
 
                 # Solo si nombre y dirección están presentes, agregamos
                 if nombre and direccion:
-                    ahora = datetime.now()
-                    if ahora.hour < 8 or (ahora.hour == 8 and ahora.minute < 30):
-                        fecha = (ahora - timedelta(days=1)).strftime("%d")
-                    else:
-                        fecha = ahora.strftime("%d")
+                    fecha = self.fecha_turno().strftime("%d")
 
                     farmacias.append({
                         "fecha": fecha,
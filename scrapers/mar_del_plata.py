@@ -1,44 +1,34 @@
 # --- START OF FILE scrapers/mar_del_plata.py ---
 
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
 from .base import BaseScraper
+from .parsing import Fragmento
 from utils import generar_link_mapa, limpiar_telefono
 
 class MarDelPlataScraper(BaseScraper):
     URL = "http://www.colfarmamdp.com.ar/"
     LOCALIDAD = "Mar del Plata"
     CONFIANZA = 3
+    CACHE_POR_TURNO = True
+    FRAGMENTO = Fragmento("tr", "trturnos")
 
     def get_fecha_turno(self):
         """
         Determina el día del turno. El turno farmacéutico generalmente
-        cambia por la mañana (ej. 8:30 AM).
+        cambia por la mañana (ej. 8:30 AM), ver BaseScraper.fecha_turno.
         """
-        ahora = datetime.now()
-        # Asumimos que el turno cambia a las 8:30 AM
-        hora_corte = ahora.replace(hour=8, minute=30, second=0, microsecond=0)
-        
-        if ahora < hora_corte:
-            # Si es antes de las 8:30, el turno corresponde al día anterior
-            turno_fecha = ahora - timedelta(days=1)
-        else:
-            # Si es después, corresponde al día actual
-            turno_fecha = ahora
-            
         # .day devuelve un entero, str() lo convierte sin ceros a la izquierda
-        return str(turno_fecha.day)
+        return str(self.fecha_turno().day)
 
     def fetch(self) -> list[dict]:
         try:
-            response = requests.get(self.URL)
+            response = self.get(self.URL)
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             print(f"Error al obtener la página de Mar del Plata: {e}")
             return []
 
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = self.parse_html(response.content)
         farmacias = []
         
         fecha_turno = self.get_fecha_turno()
@@ -1,17 +1,21 @@
-import requests
-from bs4 import BeautifulSoup
 import re
 from .base import BaseScraper
+from .parsing import Fragmento
 from urllib.parse import quote
 
 class MerloScraper(BaseScraper):
     URL = "https://www.merlo.gob.ar/project/farmaciasdeturno/"
     LOCALIDAD = "Merlo"
     CONFIANZA = 2
+    FRAGMENTO = Fragmento("div", "et_pb_toggle_content")
 
     def fetch(self):
-        response = requests.get(self.URL)
-        soup = BeautifulSoup(response.text, "html.parser")
+        # La página publica el mes completo: si no cambió, no se vuelve a parsear
+        response = self.get_cacheado(self.URL)
+        return self.parsear_cacheado(response, self.parse)
+
+    def parse(self, response):
+        soup = self.parse_html(response.text)
 
         bloques = soup.select("div.et_pb_toggle_content")
         farmacias = []
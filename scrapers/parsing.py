@@ -0,0 +1,86 @@
+import os
+import re
+from typing import NamedTuple, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Backends disponibles: "html.parser" (stdlib), "lxml" y "selectolax".
+# lxml y selectolax son opcionales; si no están instalados se usa html.parser.
+BACKENDS = ("html.parser", "lxml", "selectolax")
+
+
+def backend_configurado():
+    return os.getenv("SCRAPERS_HTML_BACKEND", "html.parser")
+
+
+class Fragmento(NamedTuple):
+    """
+    Parte de la página que necesita un scraper: un tag y, opcionalmente, una
+    clase CSS. Solo se construye el DOM de los elementos que coinciden (y su contenido).
+    """
+    tag: str
+    clase: Optional[str] = None
+
+    def strainer(self):
+        if self.clase is None:
+            return SoupStrainer(self.tag)
+        # Al parsear, "class" todavía es un string: matcheamos la clase como palabra suelta
+        return SoupStrainer(self.tag, class_=re.compile(rf"(?:^|\s){re.escape(self.clase)}(?:\s|$)"))
+
+    def css(self):
+        return self.tag if self.clase is None else f"{self.tag}.{self.clase}"
+
+
+def _disponible(backend):
+    try:
+        if backend == "lxml":
+            import lxml  # noqa: F401
+        elif backend == "selectolax":
+            import selectolax.lexbor  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _fragmentos_selectolax(markup, fragmento):
+    """
+    Usa selectolax (lexbor) para encontrar los fragmentos y devuelve su HTML
+    concatenado, descartando los que están anidados dentro de otro fragmento.
+    """
+    from selectolax.lexbor import LexborHTMLParser
+
+    nodos = LexborHTMLParser(markup).css(fragmento.css())
+    ids = {nodo.mem_id for nodo in nodos}
+    partes = []
+    for nodo in nodos:
+        padre = nodo.parent
+        while padre is not None and padre.mem_id not in ids:
+            padre = padre.parent
+        if padre is None:
+            partes.append(nodo.html)
+    return "".join(partes)
+
+
+def parsear_html(markup, fragmento=None, backend=None):
+    """
+    Devuelve un BeautifulSoup de `markup` (str o bytes) usando el backend pedido.
+
+    Si se indica un `fragmento`, solo se construye esa parte del DOM: con
+    html.parser/lxml mediante un SoupStrainer, y con selectolax extrayendo los
+    fragmentos con lexbor y parseando únicamente ese HTML.
+    """
+    backend = backend or backend_configurado()
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend HTML desconocido: {backend}")
+    if not _disponible(backend):
+        print(f"[ADVERTENCIA] El backend '{backend}' no está instalado, se usa html.parser.")
+        backend = "html.parser"
+
+    if backend == "selectolax":
+        if fragmento is None:
+            # Sin fragmento selectolax no ahorra nada: el árbol completo lo arma html.parser
+            return BeautifulSoup(markup, "html.parser")
+        return BeautifulSoup(_fragmentos_selectolax(markup, fragmento), "html.parser")
+
+    parse_only = fragmento.strainer() if fragmento else None
+    return BeautifulSoup(markup, backend, parse_only=parse_only)
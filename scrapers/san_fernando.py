@@ -1,25 +1,30 @@
 # --- START OF FILE scrapers/san_fernando.py ---
 
 import requests
-from bs4 import BeautifulSoup
 import re
 from .base import BaseScraper
+from .parsing import Fragmento
 from utils import generar_link_mapa # Importamos la utilidad para generar links de mapa
 
 class SanFernandoScraper(BaseScraper):
     URL = "https://colfarmasanfdo.org.ar/turnero.html"
     LOCALIDAD = "San Fernando"
     CONFIANZA = 3
+    FRAGMENTO = Fragmento("table")
 
     def fetch(self) -> list[dict]:
         try:
-            response = requests.get(self.URL)
+            response = self.get_cacheado(self.URL)
             response.raise_for_status()  # Lanza un error si la petición falla
         except requests.exceptions.RequestException as e:
             print(f"Error al obtener la página de San Fernando: {e}")
             return []
 
-        soup = BeautifulSoup(response.content, "html.parser")
+        # El turnero publica el mes completo: si no cambió, no se vuelve a parsear
+        return self.parsear_cacheado(response, self.parse)
+
+    def parse(self, response) -> list[dict]:
+        soup = self.parse_html(response.content)
         farmacias = []
         
         # Este diccionario mapeará el índice de una columna (0, 1, 2...) al día del mes.
@@ -1,7 +1,6 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 from .base import BaseScraper
+from .parsing import Fragmento
 from urllib.parse import quote_plus
 import re
 
@@ -9,10 +8,15 @@ class SanIsidroScraper(BaseScraper):
     URL = "https://colfarma.info/colfarmasanisidro/farmacias-de-turno/"
     LOCALIDAD = "San Isidro"
     CONFIANZA = 3  # Nivel de confianza del 1 al 3
+    FRAGMENTO = Fragmento("td", "simcal-day-has-events")
 
     def fetch(self):
-        response = requests.get(self.URL)
-        soup = BeautifulSoup(response.text, "html.parser")
+        # El calendario publica el mes completo: si no cambió, no se vuelve a parsear
+        response = self.get_cacheado(self.URL)
+        return self.parsear_cacheado(response, self.parse)
+
+    def parse(self, response):
+        soup = self.parse_html(response.text)
         farmacias = []
 
         days = soup.select("td.simcal-day-has-events")
@@ -1,7 +1,5 @@
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, date, timedelta
 from .base import BaseScraper
+from .parsing import Fragmento
 from urllib.parse import quote_plus
 import re
 
@@ -9,10 +7,12 @@ class TigreScraper(BaseScraper):
     URL = "https://www.tigre.gob.ar/salud/farmacias"
     LOCALIDAD = "Tigre"
     CONFIANZA = 3  # Nivel de confianza del 1 al 3
+    CACHE_POR_TURNO = True
+    FRAGMENTO = Fragmento("li")
 
     def fetch(self):
-        response = requests.get(self.URL, verify=False)
-        soup = BeautifulSoup(response.text, "html.parser")
+        response = self.get(self.URL, verify=False)
+        soup = self.parse_html(response.text)
         farmacias = []
 
         items = soup.select("li")
@@ -31,13 +31,7 @@ class TigreScraper(BaseScraper):
             telefono = re.sub(r"[^\d+]", "", telefono_tag.get_text(strip=True))
             mapa = mapa_tag["href"]
 
-            # Dentro del método fetch()
-            now = datetime.now()
-            corte = now.replace(hour=8, minute=30, second=0, microsecond=0)
-            if now < corte:
-                fecha = str((now - timedelta(days=1)).day)
-            else:
-                fecha = str(now.day)
+            fecha = str(self.fecha_turno().day)
 
             farmacias.append({
                 "fecha": fecha,
@@ -0,0 +1,47 @@
+import json
+import os
+from datetime import datetime
+
+from output_writer import escribir_atomico
+
+def directorio_cache():
+    # Un archivo por scraper con los registros del turno vigente; se lee al
+    # usarse, después de load_dotenv()
+    return os.getenv("SCRAPERS_TURNO_CACHE_DIR", "cache/turnos")
+
+
+def cache_habilitado():
+    return os.getenv("SCRAPERS_TURNO_CACHE", "1") != "0"
+
+
+def _ruta(clave):
+    nombre = "".join(c if c.isalnum() or c in "-_" else "_" for c in clave)
+    return os.path.join(directorio_cache(), f"{nombre}.json")
+
+
+def leer(clave, fecha_turno):
+    """
+    Devuelve los registros guardados para (clave, fecha_turno) si todavía no
+    venció el turno, o None si no hay nada válido.
+    """
+    try:
+        with open(_ruta(clave), "r", encoding="utf-8") as f:
+            entrada = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if entrada.get("clave") != clave or entrada.get("turno") != fecha_turno.isoformat():
+        return None
+    if datetime.now() >= datetime.fromisoformat(entrada["expira"]):
+        return None
+    return entrada["registros"]
+
+
+def guardar(clave, fecha_turno, expira, registros):
+    entrada = {
+        "clave": clave,
+        "turno": fecha_turno.isoformat(),
+        "expira": expira.isoformat(),
+        "registros": registros,
+    }
+    escribir_atomico(_ruta(clave), json.dumps(entrada, ensure_ascii=False).encode("utf-8"))
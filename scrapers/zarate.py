@@ -1,4 +1,3 @@
-import requests
 import html
 import re
 import json
@@ -70,7 +69,11 @@ class ZarateScraper(BaseScraper):
 
 
     def fetch(self):
-        response = requests.get(self.URL)
+        # index.js trae el mes completo: si no cambió, no se vuelve a parsear
+        response = self.get_cacheado(self.URL)
+        return self.parsear_cacheado(response, self.parse)
+
+    def parse(self, response):
         js_text = response.text
 
         turnos = self.extract_json_objects(js_text, "turnos")
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+
+from address_normalizer import slug
+from output_writer import codificar, escribir_atomico, escribir_salida
+
+MANIFEST = "manifest.json"
+
+
+def directorio_shards():
+    """
+    Un archivo por mes y localidad: data/turnos/{mes}/{localidad}.json, más un
+    manifest.json. TURNOS_SHARDS_DIR se lee al usarse, después de load_dotenv().
+    """
+    return os.getenv("TURNOS_SHARDS_DIR", "data/turnos")
+
+
+def nombre_shard(localidad):
+    """
+    Nombre de archivo para una localidad: "Mar del Plata" -> "mar-del-plata.json".
+    """
+    return slug(localidad) + ".json"
+
+
+def serializar(contenido):
+    # Mismo formato que farmacias_turno.json, para que los diffs sean legibles
+    return codificar(contenido, minificado=False)
+
+
+def leer_manifest(directorio=None):
+    directorio = directorio or directorio_shards()
+    path = os.path.join(directorio, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def hay_shards(directorio=None):
+    return leer_manifest(directorio) is not None
+
+
+def guardar_shards(data, directorio=None):
+    """
+    Guarda `data` (formato de farmacias_turno.json) como un shard por mes y
+    localidad. Solo se reescriben los shards cuyo contenido cambió (según el
+    sha256 del manifest); los que ya no están en `data` se borran. El manifest
+    se escribe al final. Devuelve la lista de archivos escritos o borrados.
+    """
+    directorio = directorio or directorio_shards()
+    anterior = leer_manifest(directorio) or {"shards": {}}
+    previos = {
+        (mes, localidad): info
+        for mes, localidades in anterior.get("shards", {}).items()
+        for localidad, info in localidades.items()
+    }
+
+    manifest = {"version": 1, "shards": {}}
+    cambiados = []
+    for mes, localidades in data.items():
+        manifest["shards"][mes] = {}
+        usados = set()
+        for localidad, contenido in localidades.items():
+            archivo = nombre_shard(localidad)
+            if archivo in usados:
+                # Dos localidades que se normalizan igual: se desambigua con un hash corto
+                archivo = f"{archivo[:-5]}-{hashlib.sha256(localidad.encode('utf-8')).hexdigest()[:8]}.json"
+            usados.add(archivo)
+            relativo = f"{mes}/{archivo}"
+
+            cuerpo = serializar(contenido)
+            sha = hashlib.sha256(cuerpo).hexdigest()
+            previo = previos.pop((mes, localidad), None)
+            path = os.path.join(directorio, mes, archivo)
+            if previo is None or previo.get("sha256") != sha or previo.get("archivo") != relativo or not os.path.exists(path):
+                escribir_atomico(path, cuerpo)
+                cambiados.append(path)
+
+            manifest["shards"][mes][localidad] = {
+                "archivo": relativo,
+                "sha256": sha,
+                "farmacias": sum(len(farmacias) for farmacias in contenido.get("dias", {}).values()),
+            }
+
+    # Shards de localidades que ya no están
+    for (mes, localidad), info in previos.items():
+        path = os.path.join(directorio, info["archivo"])
+        if os.path.exists(path):
+            os.remove(path)
+            cambiados.append(path)
+
+    manifest_path = os.path.join(directorio, MANIFEST)
+    if cambiados or anterior.get("shards") != manifest["shards"]:
+        escribir_atomico(manifest_path, serializar(manifest))
+        cambiados.append(manifest_path)
+    return cambiados
+
+
+def cargar_shards(directorio=None):
+    """
+    Arma el dict completo (formato de farmacias_turno.json) a partir de los
+    shards, en el orden del manifest.
+    """
+    directorio = directorio or directorio_shards()
+    manifest = leer_manifest(directorio)
+    if manifest is None:
+        return {}
+    data = {}
+    for mes, localidades in manifest["shards"].items():
+        data[mes] = {}
+        for localidad, info in localidades.items():
+            with open(os.path.join(directorio, info["archivo"]), "r", encoding="utf-8") as f:
+                data[mes][localidad] = json.load(f)
+    return data
+
+
+def exportar_monolitico(data, json_path):
+    """
+    Escribe el farmacias_turno.json completo para los consumidores que lo leen,
+    con sus variantes minificada y comprimidas (output_writer). Solo se tocan
+    los archivos que cambiaron. Devuelve la lista de archivos escritos.
+    """
+    return escribir_salida(data, json_path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python shard_storage.py partir|exportar [farmacias_turno.json]
+    accion = sys.argv[1] if len(sys.argv) > 1 else "exportar"
+    json_path = sys.argv[2] if len(sys.argv) > 2 else "data/farmacias_turno.json"
+    if accion == "partir":
+        with open(json_path, "r", encoding="utf-8") as f:
+            escritos = guardar_shards(json.load(f))
+        print(f"[INFO] {len(escritos)} archivos escritos en {directorio_shards()}")
+    else:
+        escritos = exportar_monolitico(cargar_shards(), json_path)
+        print(f"[INFO] {json_path}: {len(escritos)} archivos actualizados")
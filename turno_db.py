@@ -0,0 +1,291 @@
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+
+MESES = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+         "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+
+
+def fecha_iso(mes, dia, hoy=None):
+    """
+    Convierte (nombre del mes, día) en una fecha ISO. Los datos no guardan el
+    año: se asume la ocurrencia más reciente del mes que no esté en el futuro.
+    Devuelve None si el mes o el día no son válidos.
+    """
+    hoy = hoy or datetime.date.today()
+    try:
+        numero_mes = MESES.index(mes.lower()) + 1
+        anio = hoy.year if numero_mes <= hoy.month else hoy.year - 1
+        return datetime.date(anio, numero_mes, int(dia)).isoformat()
+    except ValueError:
+        return None
+
+
+def huella(localidad, farmacia):
+    """
+    Identifica una versión de una farmacia (mismos datos, misma localidad).
+    """
+    contenido = json.dumps([localidad, farmacia], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+
+class TurnoDB:
+    """
+    Backend SQLite (modo WAL) para las farmacias de turno.
+
+    Tablas normalizadas:
+    - localidades: nombre.
+    - fuentes: fuente y confianza de cada localidad en cada mes.
+    - farmacias: cada versión distinta de los datos de una farmacia.
+    - turnos: qué farmacia está de turno en qué localidad y fecha (ISO), con
+      índice en (localidad, fecha). También guarda el mes y la clave del día
+      originales para exportar el JSON exactamente igual.
+
+    Un merge es una sola transacción y cada registro se resuelve con una
+    consulta por índice, así el costo depende de lo que entra y no del historial.
+    Los conflictos se resuelven por confianza, igual que en TurnoStore.
+    """
+    def __init__(self, path=None):
+        # TURNOS_DB_PATH se lee al crear la base, después de load_dotenv()
+        self.path = path or os.getenv("TURNOS_DB_PATH", "turnos.db")
+        self._local = threading.local()
+        self._crear_tablas()
+
+    def _conexion(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _crear_tablas(self):
+        with self._conexion() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS localidades (
+                    id INTEGER PRIMARY KEY,
+                    nombre TEXT UNIQUE NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS fuentes (
+                    localidad_id INTEGER NOT NULL REFERENCES localidades (id),
+                    mes TEXT NOT NULL,
+                    fuente TEXT,
+                    confianza INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (localidad_id, mes)
+                );
+                CREATE TABLE IF NOT EXISTS farmacias (
+                    id INTEGER PRIMARY KEY,
+                    huella TEXT UNIQUE NOT NULL,
+                    localidad_id INTEGER NOT NULL REFERENCES localidades (id),
+                    nombre TEXT,
+                    direccion TEXT,
+                    telefono TEXT,
+                    mapa TEXT,
+                    lat REAL,
+                    lng REAL,
+                    sin_coordenadas INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS turnos (
+                    id INTEGER PRIMARY KEY,
+                    localidad_id INTEGER NOT NULL REFERENCES localidades (id),
+                    fecha TEXT,
+                    mes TEXT NOT NULL,
+                    dia TEXT NOT NULL,
+                    direccion TEXT,
+                    farmacia_id INTEGER NOT NULL REFERENCES farmacias (id),
+                    confianza INTEGER NOT NULL DEFAULT 1
+                );
+                CREATE INDEX IF NOT EXISTS idx_turnos_localidad_fecha ON turnos (localidad_id, fecha);
+                CREATE INDEX IF NOT EXISTS idx_turnos_clave ON turnos (localidad_id, mes, dia, direccion);
+            """)
+
+    def __len__(self):
+        return self._conexion().execute("SELECT COUNT(*) FROM turnos").fetchone()[0]
+
+    def _localidad_id(self, conn, nombre, mes, fuente, confianza):
+        fila = conn.execute("SELECT id FROM localidades WHERE nombre = ?", (nombre,)).fetchone()
+        localidad_id = fila[0] if fila else conn.execute(
+            "INSERT INTO localidades (nombre) VALUES (?)", (nombre,)
+        ).lastrowid
+
+        # La fuente del mes solo se reemplaza por una de mayor confianza
+        fila = conn.execute(
+            "SELECT confianza FROM fuentes WHERE localidad_id = ? AND mes = ?", (localidad_id, mes)
+        ).fetchone()
+        if fila is None:
+            conn.execute(
+                "INSERT INTO fuentes (localidad_id, mes, fuente, confianza) VALUES (?, ?, ?, ?)",
+                (localidad_id, mes, fuente, confianza),
+            )
+        elif confianza > fila[0]:
+            conn.execute(
+                "UPDATE fuentes SET fuente = ?, confianza = ? WHERE localidad_id = ? AND mes = ?",
+                (fuente, confianza, localidad_id, mes),
+            )
+        return localidad_id
+
+    def _farmacia_id(self, conn, localidad, localidad_id, farmacia):
+        clave = huella(localidad, farmacia)
+        fila = conn.execute("SELECT id FROM farmacias WHERE huella = ?", (clave,)).fetchone()
+        if fila is not None:
+            return fila[0]
+        coords = farmacia.get("coordenadas")
+        return conn.execute(
+            """INSERT INTO farmacias (huella, localidad_id, nombre, direccion, telefono, mapa, lat, lng, sin_coordenadas)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (clave, localidad_id, farmacia.get("nombre"), farmacia.get("direccion"), farmacia.get("telefono"),
+             farmacia.get("mapa"), coords.get("lat") if coords else None, coords.get("lng") if coords else None,
+             int(coords is None)),
+        ).lastrowid
+
+    def merge(self, data, hoy=None):
+        """
+        Incorpora datos con el formato de farmacias_turno.json en una sola
+        transacción. Devuelve la cantidad de turnos agregados o reemplazados.
+        """
+        cambios = 0
+        with self._conexion() as conn:
+            for mes, localidades in data.items():
+                for localidad, contenido in localidades.items():
+                    confianza = contenido.get("confianza", 1)
+                    localidad_id = self._localidad_id(conn, localidad, mes, contenido.get("fuente"), confianza)
+                    for dia, farmacias in contenido.get("dias", {}).items():
+                        fecha = fecha_iso(mes, dia, hoy)
+                        # Las direcciones repetidas dentro de un mismo lote se agregan todas
+                        agregadas = set()
+                        for farmacia in farmacias:
+                            direccion = farmacia.get("direccion")
+                            farmacia_id = self._farmacia_id(conn, localidad, localidad_id, farmacia)
+                            fila = None
+                            if direccion not in agregadas:
+                                fila = conn.execute(
+                                    """SELECT id, confianza, farmacia_id FROM turnos
+                                       WHERE localidad_id = ? AND mes = ? AND dia = ? AND direccion IS ?
+                                       ORDER BY id DESC LIMIT 1""",
+                                    (localidad_id, mes, dia, direccion),
+                                ).fetchone()
+                            if fila is None:
+                                conn.execute(
+                                    """INSERT INTO turnos (localidad_id, fecha, mes, dia, direccion, farmacia_id, confianza)
+                                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                                    (localidad_id, fecha, mes, dia, direccion, farmacia_id, confianza),
+                                )
+                                agregadas.add(direccion)
+                                cambios += 1
+                            elif confianza >= fila[1] and (farmacia_id, confianza) != (fila[2], fila[1]):
+                                conn.execute(
+                                    "UPDATE turnos SET farmacia_id = ?, confianza = ? WHERE id = ?",
+                                    (farmacia_id, confianza, fila[0]),
+                                )
+                                cambios += 1
+        return cambios
+
+    @staticmethod
+    def _farmacia_dict(nombre, direccion, telefono, mapa, lat, lng, sin_coordenadas):
+        return {
+            "nombre": nombre,
+            "direccion": direccion,
+            "telefono": telefono,
+            "mapa": mapa,
+            "coordenadas": None if sin_coordenadas else {"lat": lat, "lng": lng},
+        }
+
+    def turnos_del_dia(self, localidad, fecha):
+        """
+        Farmacias de turno en `localidad` el día `fecha` (date o string ISO).
+        """
+        if isinstance(fecha, datetime.date):
+            fecha = fecha.isoformat()
+        filas = self._conexion().execute(
+            """SELECT f.nombre, f.direccion, f.telefono, f.mapa, f.lat, f.lng, f.sin_coordenadas
+               FROM turnos t
+               JOIN localidades l ON l.id = t.localidad_id
+               JOIN farmacias f ON f.id = t.farmacia_id
+               WHERE l.nombre = ? AND t.fecha = ?
+               ORDER BY t.id""",
+            (localidad, fecha),
+        )
+        return [self._farmacia_dict(*fila) for fila in filas]
+
+    def exportar(self, meses=None, localidades=None):
+        """
+        Devuelve el dict con el formato de farmacias_turno.json, en el orden en
+        que se cargaron los turnos. `meses` y `localidades` limitan la
+        exportación a esos meses y esas localidades.
+
+        Se parte de las fuentes, así una localidad sin días también se exporta
+        (como en TurnoStore), al final de su mes.
+        """
+        consulta = """
+            SELECT s.mes, l.nombre, s.fuente, s.confianza, t.dia,
+                   f.nombre, f.direccion, f.telefono, f.mapa, f.lat, f.lng, f.sin_coordenadas
+            FROM fuentes s
+            JOIN localidades l ON l.id = s.localidad_id
+            LEFT JOIN turnos t ON t.localidad_id = s.localidad_id AND t.mes = s.mes
+            LEFT JOIN farmacias f ON f.id = t.farmacia_id
+        """
+        condiciones = []
+        parametros = []
+        if meses:
+            condiciones.append(f"s.mes IN ({', '.join('?' for _ in meses)})")
+            parametros += list(meses)
+        if localidades:
+            condiciones.append(f"l.nombre IN ({', '.join('?' for _ in localidades)})")
+            parametros += list(localidades)
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        consulta += " ORDER BY t.id IS NULL, t.id, s.rowid"
+
+        data = {}
+        for mes, localidad, fuente, confianza, dia, *farmacia in self._conexion().execute(consulta, parametros):
+            contenido = data.setdefault(mes, {}).setdefault(
+                localidad, {"fuente": fuente, "confianza": confianza, "dias": {}}
+            )
+            if dia is not None:
+                contenido["dias"].setdefault(dia, []).append(self._farmacia_dict(*farmacia))
+        return data
+
+    def importar_json(self, json_path, hoy=None):
+        """
+        Importa un archivo con el formato de farmacias_turno.json. `hoy` es la
+        fecha de referencia para deducir el año de cada mes (por defecto, hoy).
+        """
+        with open(json_path, "r", encoding="utf-8") as f:
+            return self.merge(json.load(f), hoy)
+
+
+def backend_sqlite():
+    return os.getenv("TURNOS_BACKEND", "json") == "sqlite"
+
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def get_turno_db():
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = TurnoDB()
+    return _db
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python turno_db.py importar|exportar [archivo.json] [AAAA-MM-DD de referencia para el año]
+    accion = sys.argv[1] if len(sys.argv) > 1 else "exportar"
+    archivo = sys.argv[2] if len(sys.argv) > 2 else "data/farmacias_turno.json"
+    if accion == "importar":
+        hoy = datetime.date.fromisoformat(sys.argv[3]) if len(sys.argv) > 3 else None
+        print(f"[INFO] {TurnoDB().importar_json(archivo, hoy)} turnos importados desde {archivo}")
+    else:
+        from output_writer import escribir_salida
+        print(f"[INFO] Archivos escritos: {escribir_salida(TurnoDB().exportar(), archivo)}")
@@ -0,0 +1,112 @@
+class TurnoStore:
+    """
+    Farmacias de turno indexadas por (mes, localidad, día, dirección).
+
+    Los datos se guardan con el mismo formato de farmacias_turno.json
+    (mes -> localidad -> {"fuente", "confianza", "dias": {dia: [farmacias]}}),
+    así que serializar es devolver el dict. Un índice aparte apunta a la
+    posición de cada farmacia en la lista de su día, y permite agregar o
+    reemplazar una farmacia en O(1) sin recorrer el resto del historial.
+
+    Conflictos: una farmacia ya cargada solo se reemplaza si la nueva viene de
+    una fuente con igual o mayor `confianza`. La fuente y la confianza de una
+    localidad se actualizan solo cuando llega una fuente de mayor confianza.
+    """
+    def __init__(self, data=None):
+        self.data = {}
+        self._indice = {}
+        self._confianza = {}
+        if data:
+            self._cargar(data)
+
+    def _cargar(self, data):
+        # Toma posesión de `data` tal cual (como hacía merge_data) y construye el índice
+        self.data = data
+        for mes, localidades in data.items():
+            for localidad, contenido in localidades.items():
+                confianza = contenido.get("confianza", 1)
+                for dia, farmacias in contenido.get("dias", {}).items():
+                    for idx, farmacia in enumerate(farmacias):
+                        clave = (mes, localidad, dia, farmacia.get("direccion"))
+                        self._indice[clave] = idx
+                        self._confianza[clave] = confianza
+
+    def __len__(self):
+        return len(self._indice)
+
+    def __contains__(self, clave):
+        return clave in self._indice
+
+    def get(self, mes, localidad, dia, direccion):
+        idx = self._indice.get((mes, localidad, dia, direccion))
+        if idx is None:
+            return None
+        return self.data[mes][localidad]["dias"][dia][idx]
+
+    def _localidad(self, mes, localidad, fuente, confianza):
+        contenido = self.data.setdefault(mes, {}).get(localidad)
+        if contenido is None:
+            contenido = self.data[mes][localidad] = {"fuente": fuente, "confianza": confianza, "dias": {}}
+        elif confianza > contenido.get("confianza", 1):
+            contenido["fuente"] = fuente
+            contenido["confianza"] = confianza
+        return contenido
+
+    def upsert(self, mes, localidad, dia, farmacia, fuente=None, confianza=1, agregar=False):
+        """
+        Agrega la farmacia al día, o la reemplaza si ya hay una con la misma
+        dirección y la nueva no tiene menor confianza. Con `agregar=True` se
+        agrega siempre (dos farmacias distintas en la misma dirección).
+        Devuelve True si cambió algo.
+        """
+        contenido = self._localidad(mes, localidad, fuente, confianza)
+        farmacias = contenido["dias"].setdefault(dia, [])
+        clave = (mes, localidad, dia, farmacia.get("direccion"))
+
+        idx = self._indice.get(clave)
+        if idx is None or agregar:
+            self._indice[clave] = len(farmacias)
+            self._confianza[clave] = confianza
+            farmacias.append(farmacia)
+            return True
+
+        if confianza < self._confianza[clave]:
+            return False
+        self._confianza[clave] = confianza
+        farmacias[idx] = farmacia
+        return True
+
+    def merge(self, data):
+        """
+        Incorpora datos con el formato de farmacias_turno.json. Devuelve la
+        cantidad de farmacias que se agregaron o reemplazaron.
+        """
+        cambios = 0
+        for mes, localidades in data.items():
+            self.data.setdefault(mes, {})
+            for localidad, contenido in localidades.items():
+                fuente = contenido.get("fuente")
+                confianza = contenido.get("confianza", 1)
+                # Una localidad sin días igual tiene que quedar registrada
+                dias = self._localidad(mes, localidad, fuente, confianza)["dias"]
+                for dia, farmacias in contenido.get("dias", {}).items():
+                    if dia not in dias:
+                        # Día nuevo: se copia la lista entera y se indexa de una vez
+                        dias[dia] = list(farmacias)
+                        for idx, farmacia in enumerate(farmacias):
+                            clave = (mes, localidad, dia, farmacia.get("direccion"))
+                            self._indice[clave] = idx
+                            self._confianza[clave] = confianza
+                        cambios += len(farmacias)
+                        continue
+
+                    # Las direcciones repetidas dentro de un mismo lote se agregan todas
+                    # (como hacía merge_data): pueden ser dos farmacias en la misma galería
+                    agregadas = set()
+                    for farmacia in farmacias:
+                        clave = (mes, localidad, dia, farmacia.get("direccion"))
+                        nueva = clave not in self._indice
+                        cambios += self.upsert(mes, localidad, dia, farmacia, fuente, confianza, agregar=clave in agregadas)
+                        if nueva:
+                            agregadas.add(clave)
+        return cambios
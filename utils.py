@@ -8,41 +8,60 @@ import urllib.parse
 import datetime as d
 import telegram
 import asyncio
+import threading
+import time
 
-from get_coords_from_maps import consultar_coordenadas  # función que busca coordenadas con cache
+from get_coords_from_maps import consultar_coordenadas, consultar_coordenadas_lote  # funciones que buscan coordenadas con cache
+from turno_store import TurnoStore
+import delta_feed
+import metrics
+import publish
+import shard_storage
+import turno_db
+from output_writer import escribir_salida
 
 
 # ... [importaciones y funciones sin cambios] ...
 
 
 def merge_data(existing, new):
-    for mes, localidades in new.items():
-        if mes not in existing:
-            existing[mes] = localidades
-        else:
-            for localidad, contenido in localidades.items():
-                if localidad not in existing[mes]:
-                    existing[mes][localidad] = contenido
-                else:
-                    for dia, nuevas_farmacias in contenido["dias"].items():
-                        if dia not in existing[mes][localidad]["dias"]:
-                            existing[mes][localidad]["dias"][dia] = nuevas_farmacias
-                        else:
-                            direcciones_existentes = {
-                                f["direccion"]: idx for idx, f in enumerate(existing[mes][localidad]["dias"][dia])
-                            }
-
-                            for f in nuevas_farmacias:
-                                dir_nueva = f["direccion"]
-                                if dir_nueva in direcciones_existentes:
-                                    idx = direcciones_existentes[dir_nueva]
-                                    existing[mes][localidad]["dias"][dia][idx] = f
-                                else:
-                                    existing[mes][localidad]["dias"][dia].append(f)
-    return existing
+    """
+    Combina `new` dentro de `existing` (ambos con el formato de farmacias_turno.json)
+    y devuelve `existing`. Para varios merges seguidos conviene usar un TurnoStore
+    directamente, así el índice se construye una sola vez.
+    """
+    store = TurnoStore(existing)
+    store.merge(new)
+    return store.data
+
+
+def cargar_historial(json_path, shards_dir):
+    """
+    Carga el historial de turnos: de los shards si ya existen, si no del archivo monolítico.
+    """
+    if shard_storage.hay_shards(shards_dir):
+        return shard_storage.cargar_shards(shards_dir)
+    if os.path.exists(json_path):
+        with open(json_path, 'r', encoding='utf-8') as f:
+            try:
+                return json.load(f)
+            except json.JSONDecodeError:
+                print("⚠️ JSON corrupto o vacío. Se reemplazará completamente.")
+    return {}
 
 
 def save_to_json(new_data):
+    """
+    Combina `new_data` con el historial y lo guarda como un shard por mes y
+    localidad (shard_storage), reescribiendo solo los que cambiaron. También
+    exporta el JSON_PATH monolítico para los consumidores existentes, salvo que
+    TURNOS_MONOLITICO=0, publica la API estática por localidad y día
+    (publish) y el delta respecto de la corrida anterior (delta_feed).
+    Devuelve la lista de archivos escritos.
+
+    Con TURNOS_BACKEND=sqlite el historial vive en turno_db: el merge se hace
+    en la base y los JSON se regeneran desde ella.
+    """
     json_path = os.getenv("JSON_PATH")
     print(f"Guardando archivo en: {json_path}")
 
@@ -50,23 +69,35 @@ def save_to_json(new_data):
         raise ValueError("La variable JSON_PATH no está definida en el .env")
 
     os.makedirs(os.path.dirname(json_path), exist_ok=True)
-
-    # Cargar data existente si existe
-    if os.path.exists(json_path):
-        with open(json_path, 'r', encoding='utf-8') as f:
-            try:
-                existing_data = json.load(f)
-            except json.JSONDecodeError:
-                print("⚠️ JSON corrupto o vacío. Se reemplazará completamente.")
-                existing_data = {}
+    shards_dir = os.getenv("TURNOS_SHARDS_DIR", os.path.join(os.path.dirname(json_path), "turnos"))
+
+    # El feed de cambios compara contra el historial antes del merge, que lo modifica en el lugar.
+    # El merge solo toca los (mes, localidad) que llegaron: alcanza con indexar esos.
+    alcance = {(mes, localidad) for mes, localidades in new_data.items() for localidad in localidades}
+    if turno_db.backend_sqlite():
+        db = turno_db.get_turno_db()
+        if len(db) == 0:
+            # Primera corrida con la base: se importa el historial en JSON
+            db.merge(cargar_historial(json_path, shards_dir))
+        previo = delta_feed.indexar(
+            db.exportar({mes for mes, _ in alcance}, {localidad for _, localidad in alcance}) if alcance else {},
+            alcance,
+        )
+        db.merge(new_data)
+        merged_data = db.exportar()
     else:
-        existing_data = {}
-
-    merged_data = merge_data(existing_data, new_data)
-
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(merged_data, f, indent=2, ensure_ascii=False)
+        historial = cargar_historial(json_path, shards_dir)
+        previo = delta_feed.indexar(historial, alcance)
+        merged_data = merge_data(historial, new_data)
 
+    escritos = shard_storage.guardar_shards(merged_data, shards_dir)
+    print(f"[INFO] Shards actualizados: {len(escritos)} archivos en {shards_dir}")
+    if os.getenv("TURNOS_MONOLITICO", "1") != "0":
+        escritos.extend(shard_storage.exportar_monolitico(merged_data, json_path))
+    # Archivos chicos por localidad y día para los clientes que solo necesitan uno
+    escritos.extend(publish.publicar_api(merged_data, os.getenv("PUBLISH_API_DIR", os.path.join(os.path.dirname(json_path), "api"))))
+    escritos.extend(delta_feed.publicar_delta(previo, merged_data, os.getenv("DELTA_FEED_DIR", os.path.join(os.path.dirname(json_path), "deltas"))))
+    return escritos
 
 
 def limpiar_telefono(raw):
@@ -78,7 +109,12 @@ def generar_link_mapa(direccion):
     return f"https://www.google.com/maps/search/?api=1&query={query}"
 
 
-def format_data_for_json(farmacias):
+def format_data_for_json(farmacias, geocodificar=True):
+    """
+    Agrupa los registros de los scrapers por mes, localidad y día. Con
+    geocodificar=False las coordenadas quedan en None para completarlas
+    después en lote con adjuntar_coordenadas().
+    """
     data = {}
 
     meses = {
@@ -119,7 +155,10 @@ def format_data_for_json(farmacias):
 
         direccion = f["direccion"]
         telefono = limpiar_telefono(f["telefono"])
-        coords = consultar_coordenadas(direccion, mapa)
+        # Las coordenadas que el scraper ya extrajo del link del mapa no pasan por el geocodificador
+        coords = f.get("coordenadas")
+        if coords is None and geocodificar:
+            coords = consultar_coordenadas(direccion, mapa, localidad)
 
         data[mes][localidad]["dias"][dia].append({
             "nombre": f["nombre"],
@@ -131,17 +170,101 @@ def format_data_for_json(farmacias):
 
     return data
 
-def commit_and_push(repo_path, message="Automatic project update"):
+def adjuntar_coordenadas(data):
     """
-    Añade TODOS los cambios del proyecto (nuevos, modificados, eliminados),
-    hace commit y push. No crea un commit si no hay cambios.
+    Completa las coordenadas faltantes de `data` (formato de format_data_for_json)
+    resolviendo todas las direcciones juntas, una vez por dirección única.
+    """
+    sin_coordenadas = [
+        (farmacia, localidad)
+        for localidades in data.values()
+        for localidad, contenido in localidades.items()
+        for farmacias in contenido["dias"].values()
+        for farmacia in farmacias
+        if farmacia.get("coordenadas") is None
+    ]
+    if not sin_coordenadas:
+        return data
+
+    coordenadas = consultar_coordenadas_lote((f["direccion"], f["mapa"], localidad) for f, localidad in sin_coordenadas)
+    for farmacia, localidad in sin_coordenadas:
+        farmacia["coordenadas"] = coordenadas[(farmacia["direccion"], localidad)]
+    return data
+
+_push_lock = threading.Lock()
+_push_hilo = None
+_push_pendiente = False
+
+
+def rutas_de_salida():
+    """
+    Directorios y archivos que genera una corrida (datos, shards, API estática,
+    copias con hash, feed de cambios y cache de coordenadas). Se agregan al
+    commit siempre, así lo que quedó sin commitear en una corrida que falló
+    entra en la siguiente.
+    """
+    data_dir = os.path.dirname(os.getenv("JSON_PATH", "")) or "data"
+    return [
+        data_dir,
+        os.getenv("TURNOS_SHARDS_DIR", os.path.join(data_dir, "turnos")),
+        os.getenv("PUBLISH_API_DIR", os.path.join(data_dir, "api")),
+        os.getenv("PUBLISH_HASH_DIR", os.path.join(data_dir, "hashed")),
+        os.getenv("DELTA_FEED_DIR", os.path.join(data_dir, "deltas")),
+        "coordenadas_cache.json",
+    ]
+
+
+def _rutas_del_repo(repo, archivos):
+    """
+    Convierte los paths escritos por la corrida en paths relativos al repo,
+    descartando los que quedan afuera.
+    """
+    raiz = os.path.abspath(repo.workdir)
+    rutas = set()
+    for path in archivos:
+        relativo = os.path.relpath(os.path.abspath(path), raiz)
+        if not relativo.startswith(".."):
+            rutas.add(relativo.replace(os.sep, "/"))
+    return sorted(rutas)
+
+
+def commit_and_push(repo_path, message="Automatic project update", archivos=None, en_segundo_plano=True):
+    """
+    Hace commit de los archivos de salida de la corrida y push. Si se indica
+    `archivos` (los paths que escribió o borró la corrida) se agregan al índice
+    esos y los cambios pendientes bajo rutas_de_salida(); si no, se agregan
+    TODOS los cambios del proyecto como antes. No crea un commit si no hay
+    cambios.
+
+    El push se hace en un thread aparte (ver encolar_push), salvo que
+    `en_segundo_plano` sea False. Devuelve el Oid del commit o None.
     """
     repo = Repository(repo_path)
     index = repo.index
 
-    index.add_all()
+    inicio = time.perf_counter()
+    if archivos is None:
+        index.add_all()
+    else:
+        for ruta in _rutas_del_repo(repo, archivos):
+            if os.path.exists(os.path.join(repo.workdir, ruta)):
+                index.add(ruta)
+            elif ruta in index:
+                index.remove(ruta)
+        # Cambios pendientes bajo las rutas de salida, aunque sean de una corrida anterior que falló
+        rutas = [ruta for ruta in _rutas_del_repo(repo, rutas_de_salida()) if ruta != "."]
+        prefijos = tuple(f"{ruta}/" for ruta in rutas)
+        for ruta in repo.status():
+            if ruta in rutas or ruta.startswith(prefijos):
+                if os.path.exists(os.path.join(repo.workdir, ruta)):
+                    index.add(ruta)
+                elif ruta in index:
+                    index.remove(ruta)
     index.write()
     tree = index.write_tree() # 'tree' es un Oid
+    metrics.registrar("staging", time.perf_counter() - inicio)
+    print(f"[INFO] Staging en {time.perf_counter() - inicio:.2f}s "
+          f"({'todo el árbol' if archivos is None else f'{len(archivos)} archivos'})")
 
     try:
         main_ref = repo.references.get("refs/heads/main")
@@ -159,7 +282,7 @@ def commit_and_push(repo_path, message="Automatic project update"):
         
         if parent_tree and tree == parent_tree.id:
             print("[INFO] No se detectaron cambios en el repositorio. No se realizará el commit.")
-            return
+            return None
 
     except KeyError:
         print("[INFO] Creando primer commit (KeyError).")
@@ -182,6 +305,19 @@ def commit_and_push(repo_path, message="Automatic project update"):
     print(f"[INFO] Commit creado con éxito: {oid}")
     # --- FIN DE LA CORRECCIÓN ---
 
+    if en_segundo_plano:
+        encolar_push(repo_path)
+    else:
+        push(repo_path)
+    return oid
+
+
+def push(repo_path):
+    """
+    Hace push de refs/heads/main a origin con las credenciales de GITHUB_REMOTE.
+    """
+    inicio = time.perf_counter()
+    repo = Repository(repo_path)
     remote = repo.remotes["origin"]
     remote_url = os.getenv("GITHUB_REMOTE")
     match = re.match(r'https://([^:@]+):?([^@]*)@', remote_url)
@@ -194,13 +330,69 @@ def commit_and_push(repo_path, message="Automatic project update"):
 
     callbacks = RemoteCallbacks(credentials=UserPass(username, password))
     remote.push(["refs/heads/main"], callbacks=callbacks)
-    print("[INFO] Push a 'origin/main' realizado con éxito.")
+    duracion = time.perf_counter() - inicio
+    # Corre en segundo plano, en paralelo con el resto de la corrida
+    metrics.registrar("push", duracion, principal=True)
+    print(f"[INFO] Push a 'origin/main' realizado con éxito en {duracion:.2f}s.")
+
+
+def _push_con_reintentos(repo_path):
+    # Reintentos del push en segundo plano (con espera exponencial entre intentos)
+    reintentos = int(os.getenv("PUSH_REINTENTOS", "3"))
+    for intento in range(1, reintentos + 1):
+        try:
+            push(repo_path)
+            return True
+        except Exception as e:
+            print(f"[ADVERTENCIA] Falló el push (intento {intento}/{reintentos}): {e}")
+            metrics.sumar("push_reintentos")
+            if intento < reintentos:
+                time.sleep(2 ** intento)
+    print("[ERROR] No se pudo hacer push a 'origin/main'. Los commits quedan para la próxima corrida.")
+    return False
+
+
+def _trabajador_push(repo_path):
+    global _push_hilo, _push_pendiente
+    while True:
+        with _push_lock:
+            _push_pendiente = False
+        _push_con_reintentos(repo_path)
+        with _push_lock:
+            if not _push_pendiente:
+                _push_hilo = None
+                return
+
+
+def encolar_push(repo_path):
+    """
+    Hace el push en un thread aparte. Si ya hay uno en curso, los pedidos que
+    llegan mientras tanto se agrupan en un único push al terminar (un push de
+    main lleva todos los commits pendientes).
+    """
+    global _push_hilo, _push_pendiente
+    with _push_lock:
+        if _push_hilo is not None:
+            _push_pendiente = True
+            print("[INFO] Ya hay un push en curso: este se agrupa con el siguiente.")
+            return
+        _push_hilo = threading.Thread(target=_trabajador_push, args=(repo_path,), name="git-push")
+        _push_hilo.start()
+
+
+def esperar_push(timeout=None):
+    """
+    Espera a que termine el push en segundo plano, si hay uno.
+    """
+    hilo = _push_hilo
+    if hilo is not None:
+        hilo.join(timeout)
 
 def generate_localities_list(input_json_path, output_json_path):
     """
     Actualiza el archivo de localidades. Lee el archivo existente, lo compara con las
     localidades actuales del scraper y añade solo las que no existen, conservando
-    los datos existentes (como las coordenadas).
+    los datos existentes (como las coordenadas). Devuelve la lista de archivos escritos.
     """
     print(f"Actualizando lista de localidades desde: {input_json_path}")
 
@@ -216,7 +408,7 @@ def generate_localities_list(input_json_path, output_json_path):
             
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print(f"[ERROR] No se pudo leer el archivo de entrada '{input_json_path}'. No se puede actualizar la lista de localidades.")
-        return
+        return []
 
     # 2. Leer el archivo de localidades.json existente o crear una estructura por defecto
     try:
@@ -258,11 +450,11 @@ def generate_localities_list(input_json_path, output_json_path):
 
     # 7. Guardar la estructura de datos (actualizada o no) de vuelta en el archivo
     os.makedirs(os.path.dirname(output_json_path), exist_ok=True)
-    with open(output_json_path, 'w', encoding='utf-8') as f:
-        json.dump(existing_data, f, indent=2, ensure_ascii=False)
+    escritos = escribir_salida(existing_data, output_json_path)
     
     total_localities = len(existing_data["Buenos Aires"])
     print(f"[INFO] Archivo de localidades actualizado con éxito. Total: {total_localities} localidades.")
+    return escritos
 
 async def send_telegram_notification(message):
     """